@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Location, Post, Comment
+from .models import Category, Location, Post, Comment, CommentNotification
+from .search import search_posts
 
 
 class CommentInline(admin.TabularInline):
@@ -39,6 +40,12 @@ class PostAdmin(admin.ModelAdmin):
     list_display_links = ('title',)
     empty_value_display = 'Не задано'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по индексу вместо icontains по всей таблице.
+        if not search_term.strip():
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 class PostInline(admin.TabularInline):
     """Публикация"""
@@ -64,7 +71,23 @@ class CommentAdmin(admin.ModelAdmin):
     )
 
 
+class CommentNotificationAdmin(admin.ModelAdmin):
+    """Очередь уведомлений о комментариях"""
+
+    list_display = (
+        'recipient',
+        'post',
+        'created_at',
+        'sent_at',
+        'attempts',
+        'next_attempt_at',
+    )
+    list_filter = ('sent_at',)
+    readonly_fields = ('last_error',)
+
+
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(CommentNotification, CommentNotificationAdmin)
 admin.site.register(Location)
 admin.site.register(Post, PostAdmin)
@@ -0,0 +1,153 @@
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import post_delete, post_save
+
+from .replicas import may_cache, note_write
+
+
+def initial_generation():
+    """Начальное поколение группы.
+
+    Берётся из текущего времени, а не равно 1: если счётчик вытеснят из
+    кэша, новое поколение не совпадёт ни с одним прежним, и старые записи
+    кэша и ETag не станут снова действительными.
+    """
+    return time.time_ns() // 1000
+
+
+def get_generation(name):
+    """Текущее поколение группы записей кэша"""
+    return cache.get_or_set(f'generation:{name}', initial_generation, None)
+
+
+def bump_generation(name):
+    """Сделать устаревшими все записи группы, сменив её поколение"""
+    note_write()
+    key = f'generation:{name}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, initial_generation(), None)
+
+
+def get_generations(names):
+    """Текущие поколения нескольких групп одним обращением к кэшу"""
+    keys = [f'generation:{name}' for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, initial_generation(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump_tags(tags):
+    """Сбросить кэшированные страницы, помеченные тегами"""
+    for tag in tags:
+        bump_generation(f'tag:{tag}')
+
+
+def count_tags(tags):
+    """Теги числа публикаций лент по тегам их страниц.
+
+    В отличие от страниц, число меняется только при изменении состава
+    ленты, а не при каждой правке публикации или комментария.
+    """
+    return {f'count:{tag}' for tag in tags}
+
+
+def tagged_key(name, parts, tags):
+    """Ключ записи, устаревающей при смене поколения любого из тегов"""
+    tags = ('all', *tags)
+    versions = get_generations(f'tag:{tag}' for tag in tags)
+    return make_template_fragment_key(name, (*parts, *tags, *versions))
+
+
+def page_cache_key(path, tags):
+    """Ключ страницы: адрес и поколения всех тегов, от которых она зависит"""
+    return tagged_key('page', (path,), tags)
+
+
+def get_or_compute(key, compute, timeout):
+    """Значение из кэша или вычисленное ``compute()`` и сохранённое.
+
+    Защита от одновременного пересчёта: пересчитывает один процесс,
+    захвативший блокировку, остальные отдают прежнее значение или ждут
+    нового до ``CACHE_LOCK_WAIT`` секунд. Запись пересчитывается с
+    вероятностью, растущей к концу срока (XFetch), поэтому часто
+    читаемое значение обновляется до того, как истечёт.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _recompute_early(*entry[1:]):
+        return entry[0]
+    lock_key = f'lock:{key}'
+    locked = cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT)
+    if not locked:
+        if entry is not None:
+            return entry[0]
+        entry = _wait_for(key)
+        if entry is not None:
+            return entry[0]
+    try:
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        expires_at = math.inf if timeout is None else time.time() + timeout
+        if may_cache():
+            cache.set(key, (value, delta, expires_at), timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
+
+
+def _recompute_early(delta, expires_at):
+    # Чем дольше вычисление и ближе срок, тем вероятнее ранний пересчёт.
+    beta = settings.CACHE_EARLY_RECOMPUTE_BETA
+    gap = -delta * beta * math.log(1 - random.random())
+    return time.time() + gap >= expires_at
+
+
+def _wait_for(key):
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def model_tag(model):
+    """Тег записей, зависящих от всех объектов модели"""
+    return f'model:{model._meta.label_lower}'
+
+
+def get_or_compute_tagged(name, parts, compute, timeout, tags=(),
+                          models=()):
+    """``get_or_compute`` для записи, устаревающей вместе с тегами и
+    изменением объектов моделей (см. ``invalidate_on_change``)"""
+    tags = (*tags, *(model_tag(model) for model in models))
+    return get_or_compute(tagged_key(name, parts, tags), compute, timeout)
+
+
+# Модели, изменение которых сбрасывает кэш, и их дополнительные теги
+_watched_models = {}
+
+
+def _invalidate_model(sender, **kwargs):
+    bump_tags((model_tag(sender), *_watched_models[sender]))
+
+
+def invalidate_on_change(model, tags=()):
+    """Сбрасывать записи с тегом модели (и теги ``tags``) при сохранении
+    и удалении её объектов"""
+    _watched_models[model] = tuple(tags)
+    for signal in (post_save, post_delete):
+        signal.connect(_invalidate_model, sender=model,
+                       dispatch_uid=f'invalidate:{model_tag(model)}')
@@ -5,3 +5,11 @@ TITLE_MAX_LENGTH = 256
 # Mаксимальная длина строки для админки
 
 TITLE_MAX_LENGTH_ADMIN = 30
+
+# Количество слов анонса публикации в ленте
+
+EXCERPT_WORDS = 10
+
+# Максимальная длина анонса публикации в символах
+
+EXCERPT_MAX_LENGTH = 256
@@ -0,0 +1,46 @@
+from django.db import transaction
+
+from .models import FeedEntry, Post
+
+# Поля публикации, копируемые в таблицу лент
+FEED_FIELDS = ('id', 'author_id', 'category_id', 'pub_date')
+
+
+def feed_entries(posts):
+    """Записи лент для видимых публикаций queryset"""
+    return (FeedEntry(**row) for row in posts.filter(
+        is_visible=True).values(*FEED_FIELDS).iterator())
+
+
+def sync_feed(pks):
+    """Привести записи лент публикаций с ключами pks к их состоянию"""
+    pks = list(pks)
+    if not pks:
+        return
+    with transaction.atomic():
+        FeedEntry.objects.filter(pk__in=pks).delete()
+        # Параллельный вызов мог уже добавить те же записи.
+        FeedEntry.objects.bulk_create(
+            feed_entries(Post.objects.filter(pk__in=pks)),
+            ignore_conflicts=True)
+
+
+def rebuild_feed(posts=None, batch_size=1000):
+    """Перестроить записи лент для публикаций queryset (по умолчанию всех).
+
+    Возвращает число записей, оставшихся в лентах.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    with transaction.atomic():
+        FeedEntry.objects.filter(pk__in=posts.values('pk')).delete()
+        created = FeedEntry.objects.bulk_create(feed_entries(posts),
+                                                batch_size=batch_size)
+    return len(created)
+
+
+def hydrate_posts(entries, queryset):
+    """Публикации queryset для записей лент в порядке записей"""
+    ids = [entry.pk for entry in entries]
+    posts = queryset.in_bulk(ids)
+    return [posts[pk] for pk in ids if pk in posts]
@@ -1,18 +1,74 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.forms.widgets import DateTimeInput
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
 from .models import Post, Comment
 
 User = get_user_model()
 
 
+class LimitedImageField(forms.ImageField):
+    """Изображение, проверенное по заголовку без полного декодирования.
+
+    Размер файла, формат и число пикселей проверяются до того, как файл
+    попадёт в хранилище; пересохранение без EXIF выполняет фоновый
+    обработчик из blog.images.
+    """
+
+    default_error_messages = {
+        **forms.ImageField.default_error_messages,
+        'too_large': 'Файл слишком большой: %(size)s, допустимо %(limit)s.',
+        'too_many_pixels': 'Изображение слишком большое: %(width)s×%(height)s'
+                           ' пикселей.',
+    }
+
+    def to_python(self, data):
+        f = forms.FileField.to_python(self, data)
+        if f is None:
+            return None
+        if f.size > settings.POST_IMAGE_MAX_BYTES:
+            raise ValidationError(
+                self.error_messages['too_large'], code='too_large', params={
+                    'size': filesizeformat(f.size),
+                    'limit': filesizeformat(settings.POST_IMAGE_MAX_BYTES)})
+        if hasattr(data, 'temporary_file_path'):
+            file = data.temporary_file_path()
+        else:
+            file = data
+            file.seek(0)
+        try:
+            # Image.open читает только заголовок, пиксели не декодируются.
+            with Image.open(file) as image:
+                image_format, (width, height) = image.format, image.size
+        except Exception as exc:
+            raise ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image',
+            ) from exc
+        if image_format not in settings.POST_IMAGE_FORMATS:
+            raise ValidationError(self.error_messages['invalid_image'],
+                                  code='invalid_image')
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'width': width, 'height': height})
+        f.content_type = Image.MIME.get(image_format)
+        if hasattr(f, 'seek') and callable(f.seek):
+            f.seek(0)
+        return f
+
+
 class PostForm(forms.ModelForm):
     """Форма добавления публикации"""
 
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': LimitedImageField}
         widgets = {
             'pub_date': DateTimeInput(attrs={'type': 'datetime-local',
                                              'class': 'form-control'},
@@ -0,0 +1,179 @@
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .caching import bump_tags
+from .models import Post
+from .query_functions import post_cache_tags
+from .workers import PeriodicTask, wake_worker
+
+logger = logging.getLogger(__name__)
+
+# Форматы уменьшенных копий: формат Pillow, расширение, MIME-тип, параметры
+VARIANT_FORMATS = (
+    ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 4}),
+    ('JPEG', 'jpg', 'image/jpeg', {'quality': 82, 'optimize': True,
+                                   'progressive': True}),
+)
+
+# Параметры пересохранения оригинала без метаданных по его формату;
+# остальные форматы (GIF) хранятся как загружены
+SANITIZE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+
+
+def pending_posts():
+    """Публикации, для изображений которых ещё нет уменьшенных копий"""
+    return Post.objects.exclude(image='').filter(image_variants={})
+
+
+def variant_name(source, width, extension):
+    # Хранилище заменит имя хэшем содержимого, важен только каталог.
+    stem = posixpath.splitext(posixpath.basename(source))[0]
+    return posixpath.join(Post._meta.get_field('image').upload_to,
+                          'variants', f'{stem}-{width}w.{extension}')
+
+
+def sanitize_original(storage, name, source, image):
+    """Пересохранить оригинал без EXIF под новым именем.
+
+    Поворот из EXIF уже применён к ``image``, профиль цвета сохраняется.
+    Возвращает имя нового файла или исходное, если формат не поддержан.
+    """
+    options = SANITIZE_OPTIONS.get(source.format)
+    if options is None:
+        return name
+    if source.format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, source.format,
+               icc_profile=source.info.get('icc_profile'), exif=b'',
+               **options)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def render_variants(post, sanitize=True):
+    """Очистить оригинал (если ``sanitize``) и создать уменьшенные копии
+    изображения.
+
+    Возвращает описание для ``Post.image_variants``: имя очищенного
+    оригинала, его размеры и список копий каждой ширины из
+    ``POST_IMAGE_WIDTHS`` во всех форматах.
+    """
+    storage = post.image.storage
+    try:
+        with storage.open(post.image.name) as source_file:
+            with Image.open(source_file) as source:
+                image = ImageOps.exif_transpose(source)
+                name = post.image.name
+                if sanitize:
+                    name = sanitize_original(storage, name, source, image)
+                image = image.convert('RGB')
+    except (OSError, UnidentifiedImageError) as error:
+        return {'source': post.image.name, 'error': str(error)}
+    width, height = image.size
+    widths = sorted({min(width, limit)
+                     for limit in settings.POST_IMAGE_WIDTHS})
+    variants = []
+    for target_width in widths:
+        target_height = max(1, round(height * target_width / width))
+        resized = image.resize((target_width, target_height),
+                               Image.Resampling.LANCZOS)
+        for image_format, extension, mime_type, options in VARIANT_FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            saved = storage.save(
+                variant_name(name, target_width, extension),
+                ContentFile(buffer.getvalue()))
+            variants.append({'name': saved, 'width': target_width,
+                             'height': target_height, 'type': mime_type})
+    return {'source': name, 'width': width, 'height': height,
+            'variants': variants}
+
+
+def delete_variants(storage, image_variants):
+    """Удалить файлы уменьшенных копий"""
+    for variant in image_variants.get('variants', ()):
+        storage.delete(variant['name'])
+
+
+def release_image(storage, name, image_variants=None):
+    """Удалить изображение и его копии, если на них не ссылается ни одна
+    публикация.
+
+    Хранилище адресуется содержимым, так что один файл может принадлежать
+    нескольким публикациям; копии одного оригинала у них тоже общие.
+    """
+    if not name or Post.objects.filter(image=name).exists():
+        return False
+    storage.delete(name)
+    if image_variants:
+        delete_variants(storage, image_variants)
+    return True
+
+
+def build_variants(post, sanitize=True):
+    """Построить копии и сохранить их, если изображение не сменилось"""
+    storage = post.image.storage
+    original = post.image.name
+    image_variants = render_variants(post, sanitize)
+    source = image_variants['source']
+    updated = Post.objects.filter(pk=post.pk, image=original).update(
+        image=source, image_variants=image_variants,
+        updated=timezone.now())
+    if not updated:
+        # Пока шла обработка, изображение заменили или пост удалили.
+        release_image(storage, source, image_variants)
+    else:
+        bump_tags(post_cache_tags(post.category_id, post.author_id))
+    if source != original:
+        release_image(storage, original)
+    return image_variants
+
+
+def build_pending_variants(limit=None):
+    """Обработать изображения, ожидающие уменьшенных копий"""
+    posts = pending_posts().order_by('pk')
+    built = 0
+    for post in posts[:limit] if limit else posts.iterator():
+        try:
+            build_variants(post)
+        except Exception:
+            logger.exception('Не удалось обработать изображение поста %s',
+                             post.pk)
+            continue
+        built += 1
+    return built
+
+
+def rebuild_variants():
+    """Пересоздать копии всех обработанных изображений.
+
+    Оригиналы уже очищены при первой обработке и повторно не
+    пересохраняются, чтобы не терять качество JPEG. Возвращает число
+    изображений.
+    """
+    posts = list(Post.objects.exclude(image='').exclude(image_variants={}))
+    # Копии одного оригинала общие у публикаций: сначала удалить все.
+    for post in posts:
+        delete_variants(post.image.storage, post.image_variants)
+    for post in posts:
+        build_variants(post, sanitize='error' in post.image_variants)
+    return len(posts)
+
+
+image_task = PeriodicTask('post-images', build_pending_variants,
+                          'POST_IMAGE_INTERVAL', 'POST_IMAGE_IN_PROCESS')
+
+
+def wake_image_worker():
+    """Сообщить обработчику о новом изображении"""
+    wake_worker(image_task.name)
@@ -0,0 +1,76 @@
+import threading
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .caching import get_generations, model_tag
+from .models import Category, Location, Post
+
+
+class LookupTable:
+    """Все объекты маленькой, редко меняющейся таблицы в памяти процесса.
+
+    Таблица перечитывается, когда меняется поколение тега модели в кэше:
+    его сбрасывают сигналы сохранения и удаления (см. blog.signals), так
+    что изменение видят все процессы.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.tag_key = f'tag:{model_tag(model)}'
+        self.generation = None
+        self.by_pk = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, generation):
+        if generation == self.generation:
+            return
+        with self._lock:
+            if generation != self.generation:
+                # Только с основной базы: снимок с отстающей реплики
+                # запомнился бы под новым поколением.
+                self.index(list(
+                    self.model._default_manager.using(DEFAULT_DB_ALIAS)))
+                self.generation = generation
+
+    def index(self, objects):
+        self.by_pk = {obj.pk: obj for obj in objects}
+
+
+class CategoryTable(LookupTable):
+    """Категории по ключу и опубликованные категории по slug"""
+
+    def index(self, objects):
+        super().index(objects)
+        self.published_by_slug = {category.slug: category
+                                  for category in objects
+                                  if category.is_published}
+
+
+categories = CategoryTable(Category)
+locations = LookupTable(Location)
+TABLES = (categories, locations)
+
+
+def refresh_tables():
+    """Перечитать устаревшие таблицы (одно обращение к кэшу)"""
+    generations = get_generations(table.tag_key for table in TABLES)
+    for table, generation in zip(TABLES, generations):
+        table.refresh(generation)
+
+
+def get_published_category(slug):
+    """Опубликованная категория по slug или None"""
+    refresh_tables()
+    return categories.published_by_slug.get(slug)
+
+
+def attach_lookups(posts):
+    """Подставить публикациям категории и места из памяти вместо JOIN"""
+    refresh_tables()
+    for field_name, table in (('category', categories),
+                              ('location', locations)):
+        field = Post._meta.get_field(field_name)
+        for post in posts:
+            obj = table.by_pk.get(getattr(post, field.attname))
+            if obj is not None:
+                field.set_cached_value(post, obj)
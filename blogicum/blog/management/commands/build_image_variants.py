@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import build_pending_variants, image_task, rebuild_variants
+from blog.workers import PeriodicCommandMixin
+
+
+class Command(PeriodicCommandMixin, BaseCommand):
+    """Создание уменьшенных копий изображений публикаций"""
+
+    help = 'Создаёт уменьшенные копии изображений, для которых их ещё нет.'
+    task = image_task
+    done_message = 'Обработано изображений'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Пересоздать копии всех изображений, не трогая оригиналы.'
+        )
+
+    def handle(self, *args, rebuild, loop, interval, **options):
+        if rebuild:
+            rebuilt = rebuild_variants()
+            self.stdout.write(f'Пересозданы копии изображений: {rebuilt}')
+        self.run_periodically(build_pending_variants, loop, interval)
@@ -0,0 +1,73 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Comment, FeedEntry, Post
+from blog.paginators import CURSOR_FORWARD, comments_paginator
+from blog.query_functions import base_query_set
+
+# Признаки полного просмотра таблицы или сортировки без индекса
+FULL_SCAN_PATTERNS = {
+    'sqlite': (
+        re.compile(r'\bSCAN (TABLE )?'
+                   r'(blog_post|blog_comment|blog_feedentry)\b'
+                   r'(?! USING (COVERING )?INDEX)'),
+        re.compile(r'USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY'),
+    ),
+    'postgresql': (
+        re.compile(r'Seq Scan on (blog_post|blog_comment|blog_feedentry)\b'),
+        re.compile(r'^\s*(->\s*)?Sort\b', re.MULTILINE),
+    ),
+}
+
+
+class Command(BaseCommand):
+    """Проверка планов запросов лент публикаций"""
+
+    help = ('Выполняет EXPLAIN для запросов лент и комментариев и завершается'
+            ' ошибкой, если какой-то из них просматривает всю таблицу или'
+            ' сортирует результат без индекса.')
+
+    def feed_querysets(self):
+        """Запросы страниц списков в том виде, в каком их строят views"""
+        limit = settings.POST_COUNT_LIMIT
+        # Для EXPLAIN значения параметров не важны.
+        return {
+            'index': FeedEntry.objects.order_by('-pub_date', '-id')[:limit],
+            'category': FeedEntry.objects.filter(category_id=0).order_by(
+                '-pub_date', '-id')[:limit],
+            'profile': base_query_set(
+                Post.objects.filter(author_id=0), projection='card')[:limit],
+            'own profile': base_query_set(
+                Post.objects.filter(author_id=0), in_published_only=False,
+                projection='card')[:limit],
+            'comments': self.comments_queryset(),
+        }
+
+    def comments_queryset(self):
+        """Запрос следующей страницы комментариев, как в PostCommentsMixin"""
+        paginator = comments_paginator(Comment.objects.filter(post_id=0))
+        cursor = paginator.encode_cursor(
+            Comment(id=0, created_at=timezone.now()), CURSOR_FORWARD)
+        return paginator.page_queryset(cursor)[0]
+
+    def handle(self, *args, **options):
+        patterns = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if patterns is None:
+            raise CommandError(
+                f'Проверка планов для {connection.vendor} не поддерживается.')
+        failed = []
+        for name, queryset in self.feed_querysets().items():
+            plan = queryset.explain()
+            self.stdout.write(f'--- {name}\n{plan}')
+            if any(pattern.search(plan) for pattern in patterns):
+                failed.append(name)
+        if failed:
+            raise CommandError(
+                'Полный просмотр или сортировка без индекса: '
+                + ', '.join(failed))
+        self.stdout.write(
+            self.style.SUCCESS('Все запросы используют индексы.'))
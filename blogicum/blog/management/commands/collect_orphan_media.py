@@ -0,0 +1,67 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    """Удаление файлов изображений, на которые не ссылаются публикации"""
+
+    help = ('Удаляет из каталога изображений публикаций файлы, которых нет'
+            ' ни в Post.image, ни среди уменьшенных копий. Освобождение'
+            ' файлов при удалении и замене изображений делают сигналы,'
+            ' команда подбирает то, что осталось после сбоев.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=60 * 60,
+            help='Не трогать файлы моложе этого числа секунд: они могут'
+                 ' принадлежать ещё не сохранённой публикации.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать файлы, которые были бы удалены.'
+        )
+
+    def referenced_names(self):
+        names = set()
+        posts = Post.objects.exclude(image='').values_list(
+            'image', 'image_variants')
+        for image, image_variants in posts.iterator():
+            names.add(image)
+            names.update(variant['name']
+                         for variant in image_variants.get('variants', ()))
+        return names
+
+    def stored_names(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        directories, files = storage.listdir(directory)
+        for name in files:
+            yield posixpath.join(directory, name)
+        for name in directories:
+            yield from self.stored_names(
+                storage, posixpath.join(directory, name))
+
+    def handle(self, *args, min_age, dry_run, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        # Файлы перечисляются до ссылок: сохранённое между двумя шагами
+        # изображение не примут за сироту.
+        stored = list(self.stored_names(storage, field.upload_to))
+        referenced = self.referenced_names()
+        threshold = timezone.now() - timedelta(seconds=min_age)
+        removed = 0
+        for name in stored:
+            if (name in referenced
+                    or storage.get_modified_time(name) > threshold):
+                continue
+            self.stdout.write(name)
+            if not dry_run:
+                storage.delete(name)
+            removed += 1
+        verb = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(f'{verb} файлов: {removed}'))
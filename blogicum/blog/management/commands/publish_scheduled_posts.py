@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.publishing import publication_task, publish_due_posts
+from blog.workers import PeriodicCommandMixin
+
+
+class Command(PeriodicCommandMixin, BaseCommand):
+    """Публикация отложенных постов, дата которых наступила"""
+
+    help = ('Делает видимыми отложенные публикации, дата которых наступила;'
+            ' в цикле просыпается к дате ближайшей публикации.')
+    task = publication_task
+    done_message = 'Опубликовано постов'
+
+    def handle(self, *args, loop, interval, **options):
+        self.run_periodically(publish_due_posts, loop, interval)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.feed import rebuild_feed
+
+
+class Command(BaseCommand):
+    """Полное перестроение таблицы лент"""
+
+    help = ('Заново заполняет таблицу лент FeedEntry видимыми публикациями.'
+            ' Обычно таблица обновляется сигналами; команда нужна после'
+            ' изменений публикаций в обход моделей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество записей, добавляемых одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        total = rebuild_feed(batch_size=batch_size)
+        self.stdout.write(f'Записей в лентах: {total}')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.search import get_backend
+
+
+class Command(BaseCommand):
+    """Полное перестроение поискового индекса публикаций"""
+
+    help = ('Очищает поисковый индекс и заново добавляет в него все'
+            ' публикации. Обычно индекс обновляется сигналами; команда'
+            ' нужна после массового импорта или смены стеммера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество публикаций, индексируемых за один раз.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        backend = get_backend()
+        posts = Post.objects.only('title', 'text').order_by('pk')
+        total = 0
+        with transaction.atomic():
+            backend.clear()
+            last_pk = 0
+            while True:
+                batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                backend.index(batch)
+                total += len(batch)
+                last_pk = batch[-1].pk
+        self.stdout.write(f'Проиндексировано публикаций: {total}')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.query_functions import recount_comments, stale_comment_counts
+
+
+class Command(BaseCommand):
+    """Пересчёт сохранённых счётчиков комментариев публикаций"""
+
+    help = 'Находит и исправляет неверные счётчики комментариев публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Количество публикаций, обрабатываемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать количество неверных счётчиков.'
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        last_pk = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+        stale_total = 0
+        for start in range(0, last_pk, batch_size):
+            batch = Post.objects.filter(pk__gt=start,
+                                        pk__lte=start + batch_size)
+            with transaction.atomic():
+                stale = stale_comment_counts(batch).values_list(
+                    'pk', flat=True)
+                if dry_run:
+                    stale_total += stale.count()
+                else:
+                    stale_total += recount_comments(
+                        Post.objects.filter(pk__in=list(stale)))
+        verb = 'Найдено' if dry_run else 'Исправлено'
+        self.stdout.write(f'{verb} неверных счётчиков: {stale_total}')
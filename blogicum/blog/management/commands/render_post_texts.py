@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.caching import bump_tags
+from blog.models import Post
+from blog.query_functions import fill_post_texts
+
+
+class Command(BaseCommand):
+    """Пересчёт анонсов и HTML текста публикаций"""
+
+    help = ('Заново строит сохранённые анонс и HTML текста всех публикаций.'
+            ' Обычно они заполняются при сохранении; команда нужна после'
+            ' изменения текстов в обход моделей или правил оформления.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество публикаций, обрабатываемых за один раз.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.only(
+            'text', 'excerpt', 'text_html', 'updated').order_by('pk')
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            changed = [post for post in batch if fill_post_texts(post)]
+            # bulk_update не трогает auto_now, а от updated зависят
+            # ключи карточек и ETag страниц публикаций.
+            now = timezone.now()
+            for post in changed:
+                post.updated = now
+            Post.objects.bulk_update(
+                changed, ['excerpt', 'text_html', 'updated'])
+            updated += len(changed)
+            last_pk = batch[-1].pk
+        if updated:
+            # Сигналы при bulk_update не срабатывают: сбросить все
+            # кэшированные страницы разом.
+            bump_tags(('all',))
+        self.stdout.write(f'Обновлено публикаций: {updated}')
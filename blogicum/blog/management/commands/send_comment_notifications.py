@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.notifications import drain_notifications, notification_task
+from blog.workers import PeriodicCommandMixin
+
+
+class Command(PeriodicCommandMixin, BaseCommand):
+    """Отправка уведомлений о комментариях из очереди"""
+
+    help = 'Отправляет накопившиеся уведомления о комментариях пачками.'
+    task = notification_task
+    done_message = 'Отправлено писем'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--threads', type=int, default=1,
+            help='Количество потоков отправки.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.COMMENT_NOTIFICATION_BATCH_SIZE,
+            help='Количество уведомлений в одной пачке.'
+        )
+
+    def handle(self, *args, loop, interval, threads, batch_size, **options):
+        self.run_periodically(
+            lambda: drain_notifications(threads, batch_size), loop, interval)
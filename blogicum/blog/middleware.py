@@ -0,0 +1,25 @@
+from django.conf import settings
+
+from .publishing import publish_if_due
+
+
+class ScheduledPublicationMiddleware:
+    """Публикует отложенные посты, срок которых наступил, до обработки
+    запроса.
+
+    Обычно это одно чтение из кэша; запрос к БД выполняется, только когда
+    срок ближайшей публикации прошёл или не закэширован. Так лента верна,
+    даже если фоновый планировщик не запущен.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Отдача файлов от публикаций не зависит.
+        self.skip_prefixes = tuple(
+            '/' + prefix.lstrip('/')
+            for prefix in (settings.MEDIA_URL, settings.STATIC_URL))
+
+    def __call__(self, request):
+        if not request.path_info.startswith(self.skip_prefixes):
+            publish_if_due()
+        return self.get_response(request)
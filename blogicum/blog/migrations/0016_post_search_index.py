@@ -0,0 +1,159 @@
+import re
+from functools import lru_cache
+
+from django.db import migrations
+
+# Копия токенизатора blog.search на момент миграции: миграция не должна
+# зависеть от того, как он изменится позже.
+WORD_RE = re.compile(r'[0-9a-zа-я]+')
+
+# Стеммер Snowball для русского языка: окончания по группам,
+# True — окончание допустимо только после «а» или «я»
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = {
+    **dict.fromkeys(('в', 'вши', 'вшись'), True),
+    **dict.fromkeys(('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+                    False),
+}
+ADJECTIVE = dict.fromkeys((
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им',
+    'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая',
+    'яя', 'ою', 'ею'), False)
+PARTICIPLE = {
+    **dict.fromkeys(('ем', 'нн', 'вш', 'ющ', 'щ'), True),
+    **dict.fromkeys(('ивш', 'ывш', 'ующ'), False),
+}
+REFLEXIVE = dict.fromkeys(('ся', 'сь'), False)
+VERB = {
+    **dict.fromkeys(('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н',
+                     'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'), True),
+    **dict.fromkeys(('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли',
+                     'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло',
+                     'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить',
+                     'ыть', 'ишь', 'ую', 'ю'), False),
+}
+NOUN = dict.fromkeys((
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я'),
+    False)
+SUPERLATIVE = dict.fromkeys(('ейш', 'ейше'), False)
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _strip(word, endings):
+    """Основа без самого длинного из окончаний; None, если его нет"""
+    for ending in sorted(endings, key=len, reverse=True):
+        if word.endswith(ending):
+            stem = word[:-len(ending)]
+            if endings[ending] and not stem.endswith(('а', 'я')):
+                return None
+            return stem
+    return None
+
+
+def _regions(word):
+    """Начало областей RV и R2 алгоритма Snowball"""
+    rv = next((index + 1 for index, letter in enumerate(word)
+               if letter in VOWELS), len(word))
+    r1 = r2 = len(word)
+    for index in range(1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            r1 = index + 1
+            break
+    for index in range(r1 + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            r2 = index + 1
+            break
+    return rv, r2
+
+
+def _strip_inflection(rv):
+    """Шаг 1: окончание деепричастия, прилагательного, глагола или
+    существительного"""
+    stemmed = _strip(rv, PERFECTIVE_GERUND)
+    if stemmed is not None:
+        return stemmed
+    reflexive = _strip(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    stemmed = _strip(rv, ADJECTIVE)
+    if stemmed is not None:
+        participle = _strip(stemmed, PARTICIPLE)
+        return stemmed if participle is None else participle
+    for endings in (VERB, NOUN):
+        stemmed = _strip(rv, endings)
+        if stemmed is not None:
+            return stemmed
+    return rv
+
+
+def _strip_derivational(rv, r2):
+    """Шаг 3: словообразовательный суффикс в области R2"""
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and len(rv) - len(ending) >= r2:
+            return rv[:-len(ending)]
+    return rv
+
+
+def _strip_superlative(rv):
+    """Шаг 4: двойное «н», превосходная степень или мягкий знак"""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    stemmed = _strip(rv, SUPERLATIVE)
+    if stemmed is not None:
+        return stemmed[:-1] if stemmed.endswith('нн') else stemmed
+    if rv.endswith('ь'):
+        return rv[:-1]
+    return rv
+
+
+@lru_cache(maxsize=10000)
+def stem(word):
+    """Основа русского слова по алгоритму Snowball"""
+    rv_start, r2_start = _regions(word)
+    head, rv = word[:rv_start], word[rv_start:]
+    rv = _strip_inflection(rv)
+    # Шаг 2
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    rv = _strip_derivational(rv, max(0, r2_start - rv_start))
+    return head + _strip_superlative(rv)
+
+
+def terms(text):
+    """Основы слов текста в порядке следования"""
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return [stem(word) if not word.isascii() else word for word in words]
+
+
+def create_search_index(apps, schema_editor):
+    # Таблица FTS5 нужна только SQLiteFTSBackend; прочие СУБД ищут без неё.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_search '
+        'USING fts5(title, text)')
+    Post = apps.get_model('blog', 'Post')
+    rows = [(post.pk, ' '.join(terms(post.title)), ' '.join(terms(post.text)))
+            for post in Post.objects.only('title', 'text').iterator()]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO blog_post_search (rowid, title, text) '
+            'VALUES (%s, %s, %s)', rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
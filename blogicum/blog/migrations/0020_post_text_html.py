@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:48
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+
+def fill_post_texts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.only('text').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:1000])
+        if not batch:
+            break
+        for post in batch:
+            excerpt = Truncator(post.text).words(10, truncate=' …')
+            post.excerpt = Truncator(excerpt).chars(256, truncate='…')
+            post.text_html = linebreaksbr(post.text, autoescape=True)
+        Post.objects.bulk_update(batch, ['excerpt', 'text_html'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_post_texts, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=256, verbose_name='Анонс'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:17
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_post_text_html'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='feedentry',
+            name='comment_count',
+        ),
+    ]
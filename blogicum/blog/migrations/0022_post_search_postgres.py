@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    # Хранимый tsvector нужен только PostgresSearchBackend.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE TABLE IF NOT EXISTS blog_post_search ('
+        'post_id bigint PRIMARY KEY, document tsvector NOT NULL)')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS blog_post_search_document_idx '
+        'ON blog_post_search USING gin (document)')
+    schema_editor.execute(
+        "INSERT INTO blog_post_search (post_id, document) "
+        "SELECT id, setweight(to_tsvector('russian', title), 'A') || "
+        "setweight(to_tsvector('russian', text), 'B') FROM blog_post "
+        "ON CONFLICT (post_id) DO NOTHING")
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_feed_entry_remove_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
-from .constants import TITLE_MAX_LENGTH, TITLE_MAX_LENGTH_ADMIN
+from .constants import (EXCERPT_MAX_LENGTH, TITLE_MAX_LENGTH,
+                        TITLE_MAX_LENGTH_ADMIN)
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -60,12 +63,43 @@ class Category(PublishedModel):
         return self.title[:TITLE_MAX_LENGTH_ADMIN]
 
 
+class PostQuerySet(models.QuerySet):
+    """Публикации с категориями и местами из blog.lookups"""
+
+    _attach_lookups = False
+
+    def attach_lookups(self):
+        """Подставлять категории и места из памяти процесса после выборки"""
+        clone = self._chain()
+        clone._attach_lookups = True
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._attach_lookups = self._attach_lookups
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super()._fetch_all()
+        if (fetched and self._attach_lookups
+                and self._iterable_class is models.query.ModelIterable):
+            from .lookups import attach_lookups
+            attach_lookups(self._result_cache)
+
+
 class Post(PublishedModel):
     """Публикации"""
 
     title = models.CharField(verbose_name='Название',
                              max_length=TITLE_MAX_LENGTH)
     text = models.TextField(verbose_name='Текст')
+    # Начало текста для карточки в ленте; заполняется сигналом при
+    # сохранении, чтобы лента не выбирала полный текст
+    excerpt = models.CharField('Анонс', max_length=EXCERPT_MAX_LENGTH,
+                               blank=True, editable=False)
+    # Текст с переносами строк в HTML для страницы публикации
+    text_html = models.TextField('Текст в HTML', blank=True, editable=False)
     pub_date = models.DateTimeField(
         # format="%Y-%m-%d %H:%M",
         verbose_name='Дата и время публикации',
@@ -91,7 +125,19 @@ class Post(PublishedModel):
         verbose_name='Категория'
     )
     image = models.ImageField('Изображение', upload_to='posts_images',
-                              blank=True)
+                              storage=ContentAddressedStorage(), blank=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+    updated = models.DateTimeField('Изменено', auto_now=True)
+    # Пост опубликован, его категория опубликована и дата публикации
+    # наступила; поддерживается сигналами и blog.publishing
+    is_visible = models.BooleanField('Виден в лентах', default=False,
+                                     editable=False)
+    # Уменьшенные копии изображения, см. blog.images
+    image_variants = models.JSONField(default=dict, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         """Meta"""
@@ -100,6 +146,21 @@ class Post(PublishedModel):
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            # Лента главной страницы: только видимые публикации.
+            models.Index(fields=('-pub_date', '-id'),
+                         condition=models.Q(is_visible=True),
+                         name='post_visible_feed_idx'),
+            # Отложенные публикации для планировщика.
+            models.Index(fields=('pub_date',),
+                         condition=models.Q(is_visible=False,
+                                            is_published=True),
+                         name='post_scheduled_idx'),
+            models.Index(fields=('category', '-pub_date', '-id'),
+                         name='post_category_feed_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='post_author_feed_idx'),
+        )
 
     def __str__(self):
         return self.title[:TITLE_MAX_LENGTH_ADMIN]
@@ -109,6 +170,38 @@ class Post(PublishedModel):
         return reverse('post:post_detail', kwargs={'pk': self.pk})
 
 
+class FeedEntry(models.Model):
+    """Видимая публикация в лентах.
+
+    Узкая копия полей, по которым лента фильтруется, считается и
+    сортируется; таблица поддерживается сигналами и blog.feed. Первичный
+    ключ совпадает с ключом публикации.
+    """
+
+    id = models.BigIntegerField('Публикация', primary_key=True)
+    # Составные индексы ниже начинаются с этих полей, отдельные не нужны.
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               db_index=False, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE,
+                                 db_index=False, related_name='+')
+    pub_date = models.DateTimeField('Дата и время публикации')
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Записи лент'
+        indexes = (
+            models.Index(fields=('-pub_date', '-id'),
+                         name='feed_entry_idx'),
+            models.Index(fields=('category', '-pub_date', '-id'),
+                         name='feed_entry_category_idx'),
+            models.Index(fields=('author', '-pub_date', '-id'),
+                         name='feed_entry_author_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.pk}: {self.pub_date}'
+
+
 class Comment(models.Model):
     """Комментарии к публикациям"""
 
@@ -122,6 +215,40 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(fields=('post', 'created_at'),
+                         name='comment_post_created_idx'),
+        )
 
     def __str__(self):
         return self.text[:TITLE_MAX_LENGTH]
+
+
+class CommentNotification(models.Model):
+    """Уведомление автора публикации о комментарии, ожидающее отправки"""
+
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    recipient = models.EmailField('Получатель')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки',
+                                                default=0)
+    next_attempt_at = models.DateTimeField('Следующая попытка',
+                                           default=timezone.now)
+    claim = models.CharField(max_length=32, blank=True, editable=False)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'уведомление о комментарии'
+        verbose_name_plural = 'Уведомления о комментариях'
+        default_related_name = 'notifications'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(fields=('next_attempt_at',),
+                         condition=models.Q(sent_at__isnull=True),
+                         name='notification_pending_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.post}'
@@ -0,0 +1,142 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections
+from django.utils import timezone
+
+from .models import CommentNotification
+from .workers import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_comment_notification(comment):
+    """Поставить уведомление автора публикации в очередь отправки"""
+    recipient = comment.post.author.email
+    if recipient:
+        CommentNotification.objects.create(
+            comment=comment, post=comment.post, recipient=recipient)
+
+
+def pending_notifications():
+    """Неотправленные уведомления, срок попытки которых наступил"""
+    return CommentNotification.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.COMMENT_NOTIFICATION_MAX_ATTEMPTS,
+        next_attempt_at__lte=timezone.now())
+
+
+def claim_notifications(batch_size):
+    """Захватить пачку уведомлений, чтобы её не взял другой обработчик"""
+    claim = uuid.uuid4().hex
+    lease = timedelta(seconds=settings.COMMENT_NOTIFICATION_LEASE)
+    ids = list(pending_notifications().order_by('post_id', 'created_at')
+               .values_list('pk', flat=True)[:batch_size])
+    # Повторная проверка срока не даст двум обработчикам взять одну запись.
+    pending_notifications().filter(pk__in=ids).update(
+        claim=claim, next_attempt_at=timezone.now() + lease)
+    return list(CommentNotification.objects.filter(claim=claim)
+                .select_related('post').order_by('recipient', 'post_id',
+                                                 'created_at'))
+
+
+def build_digest(post, count):
+    """Одно письмо обо всех новых комментариях к публикации"""
+    if count == 1:
+        subject = 'Добавлен комментарий к вашей публикации.'
+        body = f'Добавлен комментарий к публикации {post.title} !'
+    else:
+        subject = 'Добавлены комментарии к вашей публикации.'
+        body = f'К публикации {post.title} добавлено комментариев: {count}.'
+    return subject, body
+
+
+def send_notifications(batch_size=None):
+    """Отправить пачку уведомлений через одно SMTP-соединение.
+
+    Уведомления одному получателю об одной публикации объединяются в
+    одно письмо. При ошибке отправки попытка откладывается с
+    экспоненциально растущей паузой. Возвращает число отправленных писем.
+    """
+    batch = claim_notifications(
+        batch_size or settings.COMMENT_NOTIFICATION_BATCH_SIZE)
+    if not batch:
+        return 0
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as error:
+        logger.warning('Почтовый сервер недоступен: %s', error)
+        postpone_notifications(batch, error)
+        return 0
+    sent = 0
+    try:
+        for (recipient, post_id), group in groupby(
+                batch, key=lambda item: (item.recipient, item.post_id)):
+            group = list(group)
+            subject, body = build_digest(group[0].post, len(group))
+            message = EmailMessage(subject, body, settings.FROM_EMAIL,
+                                   [recipient], connection=mail_connection)
+            try:
+                message.send()
+            except Exception as error:
+                logger.warning('Не удалось отправить уведомление %s: %s',
+                               recipient, error)
+                postpone_notifications(group, error)
+                continue
+            CommentNotification.objects.filter(
+                pk__in=[item.pk for item in group]).update(
+                    sent_at=timezone.now(), claim='', last_error='')
+            sent += 1
+    finally:
+        mail_connection.close()
+    return sent
+
+
+def postpone_notifications(group, error):
+    """Отложить повторную отправку с экспоненциальной паузой"""
+    for item in group:
+        delay = min(
+            settings.COMMENT_NOTIFICATION_RETRY_DELAY * 2 ** item.attempts,
+            settings.COMMENT_NOTIFICATION_MAX_RETRY_DELAY)
+        CommentNotification.objects.filter(pk=item.pk).update(
+            attempts=item.attempts + 1, claim='', last_error=str(error),
+            next_attempt_at=timezone.now() + timedelta(seconds=delay))
+
+
+def drain_notifications(threads=1, batch_size=None):
+    """Отправить всё, что накопилось, в несколько потоков"""
+    def worker():
+        total = 0
+        while True:
+            sent = send_notifications(batch_size)
+            if not sent:
+                return total
+            total += sent
+
+    def thread_worker():
+        try:
+            return worker()
+        finally:
+            connections.close_all()
+
+    if threads <= 1:
+        return worker()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(thread_worker) for _ in range(threads)]
+    return sum(future.result() for future in futures)
+
+
+def drain_in_process():
+    """Отправка накопившихся уведомлений фоновым потоком сервера"""
+    return drain_notifications(settings.COMMENT_NOTIFICATION_THREADS)
+
+
+notification_task = PeriodicTask(
+    'comment-notifications', drain_in_process,
+    'COMMENT_NOTIFICATION_INTERVAL', 'COMMENT_NOTIFICATION_IN_PROCESS')
@@ -0,0 +1,221 @@
+import base64
+import binascii
+import json
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import tagged_key
+from .replicas import may_cache
+
+# Направления перехода по курсору
+CURSOR_FORWARD = 'n'
+CURSOR_BACKWARD = 'p'
+
+# Порядок комментариев публикации: от старых к новым
+COMMENT_ORDERING = ('created_at', 'id')
+
+# Способы подсчёта публикаций в ленте
+COUNT_EXACT = 'exact'
+COUNT_CACHED = 'cached'
+COUNT_ESTIMATED = 'estimated'
+
+# Оценка числа строк в плане запроса PostgreSQL
+PLAN_ROWS_RE = re.compile(r'rows=(\d+)')
+
+
+class InvalidCursor(InvalidPage):
+    """Некорректный курсор страницы"""
+
+
+class CursorPage:
+    """Страница курсорной пагинации"""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1],
+                                            CURSOR_FORWARD)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0],
+                                            CURSOR_BACKWARD)
+
+
+class CursorPaginator:
+    """Пагинация по ключу сортировки (keyset) без COUNT и OFFSET.
+
+    Курсор — непрозрачная строка с направлением перехода и значениями
+    полей сортировки граничного объекта страницы. Все поля ``ordering``
+    должны сортироваться в одном направлении, а последнее — быть
+    уникальным, чтобы порядок был строгим.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def encode_cursor(self, obj, direction):
+        values = [self._field(name).value_to_string(obj)
+                  for name in self.fields]
+        payload = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(
+            payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(cursor + padding))
+            if (direction not in (CURSOR_FORWARD, CURSOR_BACKWARD)
+                    or len(values) != len(self.fields)):
+                raise ValueError
+            values = [self._field(name).to_python(value)
+                      for name, value in zip(self.fields, values)]
+        except (binascii.Error, TypeError, ValueError,
+                ValidationError) as error:
+            raise InvalidCursor('Некорректный курсор страницы') from error
+        return direction, values
+
+    def page_queryset(self, cursor=None):
+        """Запрос строк страницы (на одну больше ``per_page``, чтобы узнать
+        о следующей), направление и граничные значения курсора"""
+        direction, values = CURSOR_FORWARD, None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+        backward = direction == CURSOR_BACKWARD
+        queryset = self.object_list.order_by(
+            *(self._reversed(self.ordering) if backward else self.ordering))
+        if values is not None:
+            queryset = queryset.filter(
+                self._seek(values, self.descending != backward))
+        return queryset[:self.per_page + 1], direction, values
+
+    def page(self, cursor=None):
+        """Страница после (или перед) объектом, заданным курсором"""
+        queryset, direction, values = self.page_queryset(cursor)
+        backward = direction == CURSOR_BACKWARD
+        rows = list(queryset)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backward:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True,
+                              has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more,
+                          has_previous=values is not None)
+
+    def _field(self, name):
+        return self.object_list.model._meta.get_field(name)
+
+    def _seek(self, values, descending):
+        """Условие «строго после» граничных значений полей сортировки"""
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for previous_name, value in zip(self.fields[:index], values):
+                step &= Q(**{previous_name: value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def _reversed(ordering):
+        return tuple(name[1:] if name.startswith('-') else f'-{name}'
+                     for name in ordering)
+
+
+def comments_paginator(comments, per_page=None):
+    """Курсорная пагинация комментариев публикации"""
+    return CursorPaginator(comments.select_related('author'),
+                           per_page or settings.COMMENT_COUNT_LIMIT,
+                           ordering=COMMENT_ORDERING)
+
+
+class FeedPaginator(Paginator):
+    """Постраничная пагинация с дешёвым подсчётом для больших лент.
+
+    Пока в ленте не больше ``POST_EXACT_COUNT_LIMIT`` публикаций, они
+    считаются точно запросом с LIMIT. Число для большей ленты берётся из
+    кэша, а при промахе считается точно или оценивается планировщиком
+    (``POST_COUNT_STRATEGY``). Запись в кэше привязана к тегам ``count_tags``
+    и устаревает, когда публикации добавляются в ленту или пропадают из
+    неё.
+    """
+
+    def __init__(self, *args, count_key=None, count_tags=(), strategy=None,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_key = count_key
+        self.count_tags = tuple(count_tags)
+        self.strategy = strategy or settings.POST_COUNT_STRATEGY
+
+    @cached_property
+    def count(self):
+        if self.strategy == COUNT_EXACT or self.count_key is None:
+            return self.object_list.count()
+        key = tagged_key('post_count', (self.count_key,), self.count_tags)
+        count = cache.get(key)
+        if count is not None:
+            return count
+        limit = settings.POST_EXACT_COUNT_LIMIT
+        count = self.object_list[:limit + 1].count()
+        if count <= limit:
+            return count
+        if self.strategy == COUNT_ESTIMATED:
+            count = self.estimate_count() or self.object_list.count()
+        else:
+            count = self.object_list.count()
+        if may_cache():
+            cache.set(key, count, settings.POST_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def estimate_count(self):
+        """Оценка планировщика PostgreSQL; None, если она недоступна"""
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        found = PLAN_ROWS_RE.search(self.object_list.explain())
+        return int(found.group(1)) if found else None
@@ -0,0 +1,86 @@
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .caching import bump_tags, count_tags, get_or_compute
+from .models import Post
+from .query_functions import post_cache_tags
+from .workers import PeriodicTask
+
+NEXT_DUE_KEY = 'publication:next_due'
+
+# Отложенные публикации стали видимыми; pks — их первичные ключи
+post_published = Signal()
+
+
+def pending_posts():
+    """Опубликованные, но ещё не видимые публикации"""
+    return Post.objects.filter(is_visible=False, is_published=True,
+                               category__is_published=True)
+
+
+def next_due():
+    """Время ближайшей отложенной публикации (timestamp), из кэша.
+
+    Сохранение публикации или категории сбрасывает значение, а
+    ``POST_PUBLICATION_CHECK_INTERVAL`` ограничивает срок его жизни на
+    случай изменений в обход сигналов.
+    """
+    def compute():
+        pub_date = pending_posts().aggregate(
+            next_due=Min('pub_date'))['next_due']
+        return pub_date.timestamp() if pub_date else math.inf
+
+    return get_or_compute(NEXT_DUE_KEY, compute,
+                          settings.POST_PUBLICATION_CHECK_INTERVAL)
+
+
+def reset_next_due():
+    cache.delete(NEXT_DUE_KEY)
+
+
+def publish_due_posts():
+    """Сделать видимыми публикации, дата которых наступила.
+
+    Сбрасывает страницы, на которых они появляются, и отправляет
+    ``post_published``. Возвращает число опубликованных постов.
+    """
+    with transaction.atomic():
+        # Строки, уже захваченные другим запросом, пропускаются: сигнал и
+        # сброс страниц достаются только тому, кто их опубликовал.
+        due = list(pending_posts().filter(pub_date__lte=timezone.now())
+                   .select_for_update(skip_locked=True, of=('self',))
+                   .values_list('pk', 'category_id', 'author_id'))
+        pks = [pk for pk, *_ in due]
+        published = Post.objects.filter(
+            pk__in=pks, is_visible=False).update(is_visible=True)
+    if published:
+        tags = set()
+        for category_id, author_id in {tuple(ids) for _, *ids in due}:
+            tags |= post_cache_tags(category_id, author_id)
+        bump_tags(tags | count_tags(tags))
+        post_published.send(sender=Post, pks=pks)
+    reset_next_due()
+    return published
+
+
+def publish_if_due():
+    """Ленивая проверка: опубликовать посты, если срок ближайшего наступил"""
+    if next_due() <= timezone.now().timestamp():
+        return publish_due_posts()
+    return 0
+
+
+def seconds_until_due():
+    """Секунды до ближайшей отложенной публикации"""
+    return next_due() - timezone.now().timestamp()
+
+
+publication_task = PeriodicTask(
+    'post-publication', publish_if_due, 'POST_PUBLICATION_CHECK_INTERVAL',
+    'POST_PUBLICATION_IN_PROCESS', next_delay=seconds_until_due)
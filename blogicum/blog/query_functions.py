@@ -1,21 +1,107 @@
-from django.db.models import Count
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.template.defaultfilters import linebreaksbr
 from django.utils import timezone
+from django.utils.text import Truncator
 
-from .models import Post
+from .constants import EXCERPT_MAX_LENGTH, EXCERPT_WORDS
+from .models import Category, Comment, Post
+
+User = get_user_model()
+
+
+# Наборы полей публикации по страницам: метод QuerySet и поля.
+# Карточке в ленте хватает анонса вместо полного текста и имени автора;
+# странице публикации — готовый HTML текста без исходного текста, анонса
+# и служебных полей автора.
+PROJECTIONS = {
+    'card': ('only', (
+        'title', 'excerpt', 'pub_date', 'image', 'image_variants',
+        'is_published', 'is_visible', 'comment_count', 'updated',
+        'category', 'location', 'author__username',
+    )),
+    'detail': ('defer', (
+        'text', 'excerpt', 'author__password', 'author__email',
+        'author__last_login', 'author__date_joined',
+    )),
+}
 
 
 def base_query_set(model_manager=Post.objects, in_published_only=True,
-                   add_annotate=True):
+                   projection=None):
     """Базовый запрос"""
-    queryset = (model_manager.select_related(
-        'category', 'location', 'author').order_by(
-            '-pub_date'))
+    # Категории и места подставляются из памяти процесса (blog.lookups).
+    queryset = (model_manager.select_related('author').attach_lookups()
+                .order_by('-pub_date', '-id'))
     if in_published_only:
-        queryset = (queryset.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now()))
-    if add_annotate:
-        queryset = queryset.annotate(comment_count=Count('comments'))
+        # Условие публикации материализовано в is_visible, см.
+        # blog.publishing: фильтр не зависит от текущего времени.
+        queryset = queryset.filter(is_visible=True)
+    if projection is not None:
+        method, fields = PROJECTIONS[projection]
+        queryset = getattr(queryset, method)(*fields)
 
     return queryset
+
+
+def make_excerpt(text):
+    """Анонс публикации: первые слова текста, как truncatewords"""
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    return Truncator(excerpt).chars(EXCERPT_MAX_LENGTH, truncate='…')
+
+
+def render_text_html(text):
+    """Текст публикации в HTML, как linebreaksbr"""
+    return linebreaksbr(text, autoescape=True)
+
+
+def fill_post_texts(post):
+    """Заполнить анонс и HTML текста; True, если они изменились"""
+    excerpt, text_html = make_excerpt(post.text), render_text_html(post.text)
+    changed = (post.excerpt, post.text_html) != (excerpt, text_html)
+    post.excerpt, post.text_html = excerpt, text_html
+    return changed
+
+
+def is_post_published(post):
+    """Условие публикации, которое сохраняется в Post.is_visible"""
+    return (post.is_published
+            and post.category is not None
+            and post.category.is_published
+            and post.pub_date <= timezone.now())
+
+
+def actual_comment_count():
+    """Подзапрос: фактическое число комментариев публикации"""
+    comments = (Comment.objects.filter(post=OuterRef('pk'))
+                .order_by().values('post').annotate(total=Count('pk'))
+                .values('total'))
+    return Coalesce(Subquery(comments), 0)
+
+
+def stale_comment_counts(queryset=None):
+    """Публикации, у которых сохранённый счётчик комментариев неверен"""
+    queryset = Post.objects.all() if queryset is None else queryset
+    return (queryset.annotate(actual_count=actual_comment_count())
+            .exclude(comment_count=F('actual_count')))
+
+
+def recount_comments(queryset=None):
+    """Пересчитать сохранённые счётчики комментариев одним UPDATE"""
+    queryset = Post.objects.all() if queryset is None else queryset
+    return queryset.update(comment_count=actual_comment_count())
+
+
+def post_cache_tags(category_id, author_id):
+    """Теги страниц, на которых показывается публикация"""
+    tags = {'feed'}
+    slug = Category.objects.filter(pk=category_id).values_list(
+        'slug', flat=True).first()
+    if slug:
+        tags.add(f'category:{slug}')
+    username = User.objects.filter(pk=author_id).values_list(
+        'username', flat=True).first()
+    if username:
+        tags.add(f'author:{username}')
+    return tags
@@ -0,0 +1,111 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Cookie посетителя, который недавно изменял данные
+PRIMARY_PIN_COOKIE = 'primary_pin'
+
+# Чтение текущего запроса разрешено с реплики
+_replica_reads = ContextVar('replica_reads', default=False)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Время последнего изменения, которое реплики могут ещё не видеть
+LAST_WRITE_KEY = 'replicas:last_write'
+
+
+class ReplicaRouter:
+    """Чтение с реплик из ``DATABASE_REPLICAS`` внутри представлений,
+    отмеченных ``replica_reads``; всё остальное — с основной БД"""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and _replica_reads.get():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схему реплик переносит репликация, а не migrate.
+        return False if db in settings.DATABASE_REPLICAS else None
+
+
+def note_write():
+    """Данные изменились: ``DATABASE_REPLICA_LAG`` секунд реплики могут
+    отдавать прежние"""
+    if settings.DATABASE_REPLICAS:
+        cache.set(LAST_WRITE_KEY, time.time(), settings.DATABASE_REPLICA_LAG)
+
+
+def replicas_lagging():
+    """Реплики могут ещё не видеть недавнее изменение"""
+    return cache.get(LAST_WRITE_KEY) is not None
+
+
+def may_cache():
+    """Прочитанное в текущем запросе можно кэшировать и отдавать с ETag.
+
+    Нельзя, если чтение идёт с реплики, а данные изменились не раньше
+    ``DATABASE_REPLICA_LAG`` секунд назад: запись кэша или ETag под новым
+    поколением хранили бы прежние данные.
+    """
+    return not _replica_reads.get() or not replicas_lagging()
+
+
+def is_pinned(request):
+    """Посетитель недавно изменял данные и должен видеть их сразу"""
+    return PRIMARY_PIN_COOKIE in request.COOKIES
+
+
+def replica_reads(view):
+    """Представление только читает данные: запросы идут на реплику.
+
+    Посетитель, недавно изменявший данные, читает с основной БД. Ответ
+    TemplateResponse отрисовывается внутри, чтобы ленивые запросы шаблона
+    тоже шли на реплику.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (not settings.DATABASE_REPLICAS
+                or request.method not in SAFE_METHODS
+                or is_pinned(request)):
+            return view(request, *args, **kwargs)
+        # Сессия и пользователь читаются с основной БД: вход
+        # и выход не должны зависеть от отставания реплики.
+        request.user.is_authenticated
+        token = _replica_reads.set(True)
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        finally:
+            _replica_reads.reset(token)
+        return response
+    return wrapper
+
+
+def pin_primary(view):
+    """После успешного изменения данных посетитель читает с основной БД
+    ``DATABASE_PRIMARY_PIN_SECONDS`` секунд"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if (settings.DATABASE_REPLICAS
+                and request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1',
+                max_age=settings.DATABASE_PRIMARY_PIN_SECONDS,
+                httponly=True, samesite='Lax')
+        return response
+    return wrapper
@@ -0,0 +1,296 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+WORD_RE = re.compile(r'[0-9a-zа-я]+')
+
+# Стеммер Snowball для русского языка: окончания по группам,
+# True — окончание допустимо только после «а» или «я»
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = {
+    **dict.fromkeys(('в', 'вши', 'вшись'), True),
+    **dict.fromkeys(('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+                    False),
+}
+ADJECTIVE = dict.fromkeys((
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им',
+    'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая',
+    'яя', 'ою', 'ею'), False)
+PARTICIPLE = {
+    **dict.fromkeys(('ем', 'нн', 'вш', 'ющ', 'щ'), True),
+    **dict.fromkeys(('ивш', 'ывш', 'ующ'), False),
+}
+REFLEXIVE = dict.fromkeys(('ся', 'сь'), False)
+VERB = {
+    **dict.fromkeys(('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н',
+                     'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'), True),
+    **dict.fromkeys(('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли',
+                     'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло',
+                     'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить',
+                     'ыть', 'ишь', 'ую', 'ю'), False),
+}
+NOUN = dict.fromkeys((
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я'),
+    False)
+SUPERLATIVE = dict.fromkeys(('ейш', 'ейше'), False)
+DERIVATIONAL = ('ость', 'ост')
+
+
+def _strip(word, endings):
+    """Основа без самого длинного из окончаний; None, если его нет"""
+    for ending in sorted(endings, key=len, reverse=True):
+        if word.endswith(ending):
+            stem = word[:-len(ending)]
+            if endings[ending] and not stem.endswith(('а', 'я')):
+                return None
+            return stem
+    return None
+
+
+def _regions(word):
+    """Начало областей RV и R2 алгоритма Snowball"""
+    rv = next((index + 1 for index, letter in enumerate(word)
+               if letter in VOWELS), len(word))
+    r1 = r2 = len(word)
+    for index in range(1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            r1 = index + 1
+            break
+    for index in range(r1 + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            r2 = index + 1
+            break
+    return rv, r2
+
+
+def _strip_inflection(rv):
+    """Шаг 1: окончание деепричастия, прилагательного, глагола или
+    существительного"""
+    stemmed = _strip(rv, PERFECTIVE_GERUND)
+    if stemmed is not None:
+        return stemmed
+    reflexive = _strip(rv, REFLEXIVE)
+    if reflexive is not None:
+        rv = reflexive
+    stemmed = _strip(rv, ADJECTIVE)
+    if stemmed is not None:
+        participle = _strip(stemmed, PARTICIPLE)
+        return stemmed if participle is None else participle
+    for endings in (VERB, NOUN):
+        stemmed = _strip(rv, endings)
+        if stemmed is not None:
+            return stemmed
+    return rv
+
+
+def _strip_derivational(rv, r2):
+    """Шаг 3: словообразовательный суффикс в области R2"""
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and len(rv) - len(ending) >= r2:
+            return rv[:-len(ending)]
+    return rv
+
+
+def _strip_superlative(rv):
+    """Шаг 4: двойное «н», превосходная степень или мягкий знак"""
+    if rv.endswith('нн'):
+        return rv[:-1]
+    stemmed = _strip(rv, SUPERLATIVE)
+    if stemmed is not None:
+        return stemmed[:-1] if stemmed.endswith('нн') else stemmed
+    if rv.endswith('ь'):
+        return rv[:-1]
+    return rv
+
+
+@lru_cache(maxsize=10000)
+def stem(word):
+    """Основа русского слова по алгоритму Snowball"""
+    rv_start, r2_start = _regions(word)
+    head, rv = word[:rv_start], word[rv_start:]
+    rv = _strip_inflection(rv)
+    # Шаг 2
+    if rv.endswith('и'):
+        rv = rv[:-1]
+    rv = _strip_derivational(rv, max(0, r2_start - rv_start))
+    return head + _strip_superlative(rv)
+
+
+def terms(text):
+    """Основы слов текста в порядке следования"""
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return [stem(word) if not word.isascii() else word for word in words]
+
+
+class SearchBackend:
+    """Поисковый индекс публикаций.
+
+    Индекс обновляется по сигналам сохранения и удаления публикаций, а
+    правила публикации применяются к выдаче через исходный queryset.
+    """
+
+    def index(self, posts):
+        """Добавить или обновить публикации в индексе"""
+
+    def remove(self, pks):
+        """Удалить публикации из индекса"""
+
+    def clear(self):
+        """Очистить индекс перед полным перестроением"""
+
+    def search(self, queryset, query):
+        """Публикации queryset, найденные по запросу, по убыванию
+        релевантности"""
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Индекс в виртуальной таблице FTS5 SQLite.
+
+    В таблицу пишутся основы слов заголовка и текста, поэтому запрос
+    «публикации» находит и «публикация», и «публикаций». Таблицу создаёт
+    миграция 0016.
+    """
+
+    table = 'blog_post_search'
+    # Вес совпадения в заголовке и в тексте для bm25
+    title_weight = 10.0
+    text_weight = 1.0
+
+    def index(self, posts):
+        rows = [(post.pk, ' '.join(terms(post.title)),
+                 ' '.join(terms(post.text))) for post in posts]
+        if not rows:
+            return
+        self.remove([pk for pk, *_ in rows])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                f'VALUES (%s, %s, %s)', rows)
+
+    def remove(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid IN '
+                f'({", ".join(["%s"] * len(pks))})', pks)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def match_expression(self, query):
+        # Каждая основа — префикс в кавычках: синтаксис FTS5 из запроса
+        # посетителя не пропускается, а недописанное слово находится.
+        return ' '.join(f'"{term}"*' for term in terms(query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        post_id = f'"{queryset.model._meta.db_table}"."id"'
+        found = RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            (match,))
+        rank = RawSQL(
+            f'SELECT bm25({self.table}, %s, %s) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s AND rowid = {post_id}',
+            (self.title_weight, self.text_weight, match))
+        # bm25 тем меньше, чем документ релевантнее.
+        return queryset.filter(pk__in=found).annotate(
+            search_rank=rank).order_by('search_rank', '-pub_date', '-id')
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Полнотекстовый поиск PostgreSQL с русской конфигурацией.
+
+    tsvector заголовка (вес A) и текста (вес B) хранится в таблице с
+    индексом GIN, которую создаёт миграция 0022; запрос не строит вектор
+    для каждой строки.
+    """
+
+    table = 'blog_post_search'
+    document = ("setweight(to_tsvector('russian', %s), 'A') || "
+                "setweight(to_tsvector('russian', %s), 'B')")
+    search_query = "websearch_to_tsquery('russian', %s)"
+
+    def index(self, posts):
+        rows = [(post.pk, post.title, post.text) for post in posts]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (post_id, document) '
+                f'VALUES (%s, {self.document}) ON CONFLICT (post_id) '
+                f'DO UPDATE SET document = EXCLUDED.document', rows)
+
+    def remove(self, pks):
+        pks = list(pks)
+        if not pks:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE post_id = ANY(%s)', [pks])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, queryset, query):
+        if not terms(query):
+            return queryset.none()
+        post_id = f'"{queryset.model._meta.db_table}"."id"'
+        found = RawSQL(
+            f'SELECT post_id FROM {self.table} '
+            f'WHERE document @@ {self.search_query}', (query,))
+        rank = RawSQL(
+            f'SELECT ts_rank(document, {self.search_query}) '
+            f'FROM {self.table} WHERE post_id = {post_id}', (query,))
+        return queryset.filter(pk__in=found).annotate(
+            search_rank=rank).order_by('-search_rank', '-pub_date', '-id')
+
+
+class ContainsSearchBackend(SearchBackend):
+    """Поиск подстрок основ слов без индекса для прочих СУБД.
+
+    Находит публикации, в заголовке или тексте которых есть все основы
+    слов запроса; выдача — по дате публикации.
+    """
+
+    def search(self, queryset, query):
+        words = terms(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(text__icontains=word))
+        return queryset.order_by('-pub_date', '-id')
+
+
+# Бэкенды по СУБД основной базы, если SEARCH_BACKEND не задан
+VENDOR_BACKENDS = {
+    'sqlite': 'blog.search.SQLiteFTSBackend',
+    'postgresql': 'blog.search.PostgresSearchBackend',
+}
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """Поисковый бэкенд из настройки SEARCH_BACKEND или по СУБД"""
+    path = settings.SEARCH_BACKEND or VENDOR_BACKENDS.get(
+        connection.vendor, 'blog.search.ContainsSearchBackend')
+    return import_string(path)()
+
+
+def search_posts(queryset, query):
+    """Найти публикации queryset по запросу посетителя"""
+    return get_backend().search(queryset, query)
@@ -0,0 +1,143 @@
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+# Заранее сжатые копии: кодировка, суффикс файла
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+# Имена, которые меняются вместе с содержимым: хэш ManifestStaticFilesStorage
+# (12 символов) и хэш ContentAddressedStorage (64 символа)
+IMMUTABLE_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$|(^|/)[0-9a-f]{64}\.\w+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return {part.split(';')[0].strip() for part in header.split(',')}
+
+
+def cache_control(path):
+    if IMMUTABLE_NAME_RE.search(path):
+        return (f'public, max-age={settings.FILE_IMMUTABLE_MAX_AGE},'
+                ' immutable')
+    return f'public, max-age={settings.FILE_MAX_AGE}'
+
+
+def parse_range(header, size):
+    """Границы единственного диапазона из Range; None — отдать файл целиком,
+    False — диапазон невыполним"""
+    found = RANGE_RE.match(header.replace(' ', ''))
+    if not found or found.groups() == ('', ''):
+        return None
+    start, end = found.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, path, document_root, accel_location=''):
+    """Отдать файл с ETag, Last-Modified, Range и долгим кэшированием.
+
+    Если включён ``FILE_OFFLOAD``, тело отдаёт веб-сервер по заголовку
+    X-Sendfile или X-Accel-Redirect (путь от ``FILE_ACCEL_PREFIX`` и
+    ``accel_location``), а Django только проверяет запрос и выставляет
+    заголовки.
+    """
+    try:
+        full_path = Path(safe_join(document_root, path))
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден')
+    if not full_path.is_file():
+        raise Http404('Файл не найден')
+    content_type, _ = mimetypes.guess_type(full_path.name)
+    content_type = content_type or 'application/octet-stream'
+    encoding = None
+    # Веб-серверу, которому передаётся отдача, сжатые копии не нужны:
+    # их он находит сам (gzip_static и т. п.).
+    accepted = set() if settings.FILE_OFFLOAD else accepted_encodings(request)
+    for name, suffix in PRECOMPRESSED:
+        compressed = full_path.with_name(full_path.name + suffix)
+        if name in accepted and compressed.is_file():
+            full_path, encoding = compressed, name
+            break
+    stat = full_path.stat()
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = build_response(
+            request, full_path, accel_location + path, stat.st_size,
+            content_type, etag)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control(path)
+    response['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def build_response(request, full_path, accel_path, size, content_type,
+                   etag):
+    if settings.FILE_OFFLOAD == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.FILE_ACCEL_PREFIX + accel_path
+        return response
+    if settings.FILE_OFFLOAD == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(full_path)
+        return response
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    byte_range = None
+    if header and (not if_range or if_range == etag):
+        byte_range = parse_range(header, size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'),
+                                content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(full_path, start, end - start + 1),
+            status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_media(request, path):
+    """Загруженные файлы из MEDIA_ROOT"""
+    return serve_file(request, path, settings.MEDIA_ROOT, 'media/')
+
+
+def serve_static(request, path):
+    """Собранная статика из STATIC_ROOT"""
+    return serve_file(request, path, settings.STATIC_ROOT, 'static/')
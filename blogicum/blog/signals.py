@@ -0,0 +1,218 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_tags, count_tags, invalidate_on_change, model_tag
+from .feed import sync_feed
+from .images import release_image, wake_image_worker
+from .models import Category, Comment, FeedEntry, Location, Post
+from .publishing import post_published, reset_next_due
+from .query_functions import (fill_post_texts, is_post_published,
+                              post_cache_tags)
+from .search import get_backend as get_search_backend
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Учесть новый комментарий в счётчике публикации"""
+    # При загрузке фикстур счётчики пересчитывает recount_comments.
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, raw=False, **kwargs):
+    """Отметить изменение публикации при правке комментария"""
+    # Время изменения публикации учитывает и её комментарии: по нему
+    # строятся ETag и Last-Modified страницы публикации.
+    if not created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Исключить удалённый комментарий из счётчика публикации"""
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1, updated=timezone.now())
+
+
+@receiver(pre_save, sender=Post)
+def set_post_updated(sender, instance, raw=False, **kwargs):
+    """Заполнить время изменения при загрузке фикстур: auto_now при raw
+    не срабатывает"""
+    if raw and instance.updated is None:
+        instance.updated = timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+def set_post_texts(sender, instance, **kwargs):
+    """Сохранить анонс для карточки в ленте и HTML текста для страницы
+    публикации"""
+    fill_post_texts(instance)
+
+
+@receiver(pre_save, sender=Post)
+def set_post_visibility(sender, instance, **kwargs):
+    """Сохранить условие публикации в is_visible"""
+    instance.is_visible = is_post_published(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reschedule_publication(sender, **kwargs):
+    """Срок ближайшей отложенной публикации мог измениться"""
+    transaction.on_commit(reset_next_due)
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, raw=False, **kwargs):
+    """Снять с публикации или вернуть посты категории вместе с их
+    записями в лентах"""
+    posts = Post.objects.filter(category=instance)
+    if instance.is_published:
+        pks = list(posts.filter(
+            is_visible=False, is_published=True,
+            pub_date__lte=timezone.now()).values_list('pk', flat=True))
+        if pks:
+            Post.objects.filter(pk__in=pks).update(is_visible=True)
+            sync_feed(pks)
+    else:
+        posts.filter(is_visible=True).update(is_visible=False)
+        FeedEntry.objects.filter(category=instance).delete()
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Посты удаляемой категории останутся без категории и не видны"""
+    Post.objects.filter(category=instance, is_visible=True).update(
+        is_visible=False)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw=False, **kwargs):
+    """Запомнить страницы, с которых публикация может пропасть,
+    и прежнее изображение, если его заменили"""
+    old = Post.objects.filter(pk=instance.pk).values(
+        'category_id', 'author_id', 'image', 'image_variants', 'is_visible'
+    ).first() if instance.pk else None
+    if old is None:
+        instance._old_cache_tags = set()
+        instance._old_feed_state = None
+        return
+    instance._old_cache_tags = post_cache_tags(old['category_id'],
+                                               old['author_id'])
+    instance._old_feed_state = (old['is_visible'], old['category_id'],
+                                old['author_id'])
+    if old['image'] != instance.image.name:
+        instance._old_image = (old['image'], old['image_variants'])
+        instance.image_variants = {}
+
+
+@receiver(post_save, sender=Post)
+def process_post_image(sender, instance, raw=False, **kwargs):
+    """Передать новое изображение фоновому обработчику
+    и освободить заменённое"""
+    old_image = getattr(instance, '_old_image', None)
+    if old_image:
+        storage = instance.image.storage
+        transaction.on_commit(lambda: release_image(storage, *old_image))
+    if instance.image and not instance.image_variants and not raw:
+        transaction.on_commit(wake_image_worker)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    """Освободить изображение удалённой публикации"""
+    if instance.image:
+        storage = instance.image.storage
+        name, variants = instance.image.name, instance.image_variants
+        transaction.on_commit(lambda: release_image(storage, name, variants))
+
+
+@receiver(post_save, sender=Post)
+def update_feed_entry(sender, instance, **kwargs):
+    """Добавить, обновить или убрать запись публикации в лентах"""
+    sync_feed([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def delete_feed_entry(sender, instance, **kwargs):
+    """Убрать удалённую публикацию из лент"""
+    FeedEntry.objects.filter(pk=instance.pk).delete()
+
+
+@receiver(post_published, sender=Post)
+def add_published_feed_entries(sender, pks, **kwargs):
+    """Добавить в ленты публикации, дата которых наступила"""
+    sync_feed(pks)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """Обновить публикацию в поисковом индексе"""
+    get_search_backend().index([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    """Убрать удалённую публикацию из поискового индекса"""
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, signal, **kwargs):
+    """Сбросить страницы лент, на которых есть публикация, а если
+    публикация вошла в ленты или пропала из них — и число публикаций"""
+    tags = (post_cache_tags(instance.category_id, instance.author_id)
+            | getattr(instance, '_old_cache_tags', set()))
+    feed_state = (instance.is_visible, instance.category_id,
+                  instance.author_id)
+    if (signal is post_delete
+            or getattr(instance, '_old_feed_state', None) != feed_state):
+        tags |= count_tags(tags)
+    bump_tags(tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    """Карточки показывают число комментариев — сбросить их страницы"""
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'category_id', 'author_id').first()
+    if post:
+        bump_tags(post_cache_tags(**post))
+
+
+@receiver(post_save, sender=User)
+def invalidate_profile_page(sender, instance, update_fields=None, **kwargs):
+    """Сбросить страницу пользователя при изменении его данных"""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_tags((f'author:{instance.username}',))
+
+
+# Карточки и страницы публикаций показывают категорию и место.
+invalidate_on_change(Category, tags=('all',))
+invalidate_on_change(Location, tags=('all',))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def refresh_lookup_tables(sender, **kwargs):
+    """Сбросить таблицы blog.lookups ещё раз после фиксации транзакции"""
+    # Поколение меняется уже при сохранении, и процесс, перечитавший
+    # таблицу до фиксации, запомнил бы старые данные под новым поколением.
+    transaction.on_commit(lambda: bump_tags((model_tag(sender),)))
@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Расширения файлов, которые имеет смысл сжимать заранее
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.txt', '.html', '.json',
+                           '.xml', '.map', '.ico')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла — хэш его содержимого.
+
+    Файл сохраняется как ``<каталог>/ab/cd/<sha256><расширение>`` в
+    каталоге из ``upload_to``. Повторная загрузка того же содержимого не
+    пишет ничего на диск и возвращает имя уже сохранённого файла, поэтому
+    один файл может быть у нескольких публикаций: удалять его можно, только
+    когда на него не осталось ссылок (см. blog.images.release_image).
+    """
+
+    hash_chunk_size = 64 * 1024
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks(self.hash_chunk_size):
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(posixpath.dirname(name), digest[:2],
+                              digest[2:4], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и заранее сжатыми копиями.
+
+    Рядом с каждым хэшированным файлом collectstatic кладёт ``.gz`` и,
+    если установлен пакет brotli, ``.br`` — их отдаёт blog.serving без
+    сжатия на лету. Копия не сохраняется, если она не меньше оригинала.
+    """
+
+    min_compress_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < self.min_compress_size:
+            return
+        compressed = {'.gz': gzip.compress(content, mtime=0)}
+        if brotli is not None:
+            compressed['.br'] = brotli.compress(content)
+        for suffix, data in compressed.items():
+            if len(data) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
@@ -0,0 +1,59 @@
+from django import template
+from django.conf import settings
+from django.http import QueryDict
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.caching import get_or_compute_tagged
+from blog.models import Category, Location
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка публикации из кэша фрагментов"""
+    # Ключ меняется при любой правке публикации, а переименование
+    # категорий и мест сбрасывает все карточки.
+    html = get_or_compute_tagged(
+        'post_card',
+        (post.pk, post.updated.timestamp(), post.comment_count,
+         post.author.username),
+        lambda: render_to_string('includes/post_card.html', {'post': post}),
+        settings.POST_CARD_CACHE_TIMEOUT, models=(Category, Location))
+    return mark_safe(html)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, lazy=True):
+    """Изображение публикации с уменьшенными копиями в srcset"""
+    storage = post.image.storage
+    srcsets = {}
+    for variant in post.image_variants.get('variants', ()):
+        srcsets.setdefault(variant['type'], []).append(
+            f"{storage.url(variant['name'])} {variant['width']}w")
+    return {
+        'post': post,
+        'webp_srcset': ', '.join(srcsets.get('image/webp', ())),
+        'jpeg_srcset': ', '.join(srcsets.get('image/jpeg', ())),
+        'sizes': settings.POST_IMAGE_SIZES,
+        'width': post.image_variants.get('width'),
+        'height': post.image_variants.get('height'),
+        'lazy': lazy,
+    }
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, остальные — многоточие"""
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends)
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, page):
+    """Ссылка на страницу с сохранением остальных параметров запроса"""
+    request = context.get('request')
+    query = request.GET.copy() if request else QueryDict(mutable=True)
+    query['page'] = page
+    return f'?{query.urlencode()}'
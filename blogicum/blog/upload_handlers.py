@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Запись загружаемых файлов во временный файл на диске по частям.
+
+    В памяти держится только текущая часть запроса. Всё, что больше
+    ``POST_IMAGE_MAX_BYTES``, на диск не пишется: файл остаётся обрезанным,
+    а его полный размер в ``size`` позволяет форме отклонить загрузку.
+    Поэтому обработчик ставится только на представления с
+    forms.LimitedImageField (см. view_mixins.LimitedUploadMixin): обычное
+    ImageField приняло бы обрезанный файл.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.POST_IMAGE_MAX_BYTES:
+            self.file.write(raw_data)
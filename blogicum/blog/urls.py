@@ -11,6 +11,8 @@ post_urls = [
          name='edit_post'),
     path('<int:post_id>/delete/', views.PostDeleteView.as_view(),
          name='delete_post'),
+    path('<int:post_id>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('<int:post_id>/comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
     path('<int:post_id>/edit_comment/<int:comment_id>/',
@@ -29,6 +31,7 @@ urlpatterns = [
     path('profile/<str:cur_username>/', views.ProfileListView.as_view(),
          name='profile'),
     path('user/edit/', views.ProfileUpdateView.as_view(), name='edit_profile'),
+    path('search/', views.SearchPostsView.as_view(), name='search'),
     path('auth/', include('django.contrib.auth.urls')),
 
 ]
@@ -1,10 +1,28 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse_lazy, reverse
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 
+from .caching import count_tags, get_generations, page_cache_key
+from .feed import hydrate_posts
 from .forms import CommentForm
-from .models import Comment
+from .models import Comment, FeedEntry
+from .paginators import CursorPaginator, FeedPaginator, comments_paginator
+from .query_functions import base_query_set
+from .replicas import may_cache
+from .upload_handlers import LimitedTemporaryFileUploadHandler
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -20,6 +38,23 @@ class OnlyAuthorMixin(UserPassesTestMixin):
                          kwargs={'post_id': self.kwargs['post_id']}))
 
 
+class LimitedUploadMixin:
+    """Загрузка файлов через LimitedTemporaryFileUploadHandler.
+
+    Обработчик ставится до разбора тела запроса, поэтому проверка CSRF
+    (она читает request.POST) выполняется уже после этого.
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [LimitedTemporaryFileUploadHandler(request)]
+        return self._dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def _dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+
 class BaseCommentMixin(LoginRequiredMixin):
     """Комментарий"""
 
@@ -34,6 +69,231 @@ class BaseCommentMixin(LoginRequiredMixin):
             kwargs={'post_id': self.object.post.pk}
         )
 
+    @transaction.atomic
+    def post(self, request, *args, **kwargs):
+        # Комментарий и счётчик публикации меняются в одной транзакции.
+        return super().post(request, *args, **kwargs)
+
     def get_object(self, queryset=None):
         return get_object_or_404(Comment, post=self.kwargs['post_id'],
                                  pk=self.kwargs['comment_id'])
+
+
+class PostCommentsMixin:
+    """Публикация, доступная посетителю, и страница её комментариев"""
+
+    pk_url_kwarg = 'post_id'
+    comments_per_page = settings.COMMENT_COUNT_LIMIT
+
+    @cached_property
+    def visible_post(self):
+        cur_post = get_object_or_404(
+            base_query_set(in_published_only=False, projection='detail'),
+            id=self.kwargs['post_id'])
+        # Автор видит свою публикацию всегда, остальные — только
+        # опубликованную; проверка не требует второго запроса.
+        if (cur_post.author_id != self.request.user.id
+                and not cur_post.is_visible):
+            raise Http404('Публикация не найдена')
+        return cur_post
+
+    def get_object(self, queryset=None):
+        return self.visible_post
+
+    def get_etag_parts(self):
+        # Правки публикации и её комментариев меняют post.updated,
+        # переименование категорий и мест — поколение тега 'all'.
+        post = self.visible_post
+        return (post.pk, post.updated.timestamp(), post.comment_count,
+                *get_generations(('tag:all',)))
+
+    def get_last_modified(self):
+        return self.visible_post.updated
+
+    def get_comments_page(self):
+        paginator = comments_paginator(self.object.comments.all(),
+                                       self.comments_per_page)
+        try:
+            return paginator.page(self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+
+
+class ConditionalGetMixin:
+    """Ответ 304 на условный GET до выборки данных и отрисовки шаблона.
+
+    ETag строится из адреса, посетителя и ``get_etag_parts`` — дешёвой
+    версии содержимого страницы; ``get_last_modified`` возвращает время
+    изменения, если оно известно точно.
+    """
+
+    def get_etag_parts(self):
+        raise NotImplementedError(
+            'Определите get_etag_parts в дочернем классе')
+
+    def get_last_modified(self):
+        return None
+
+    def get_etag(self):
+        request = self.request
+        # Токен CSRF попадает в формы страницы, поэтому входит в версию.
+        parts = (request.get_full_path(), request.user.pk,
+                 request.META.get('CSRF_COOKIE'), *self.get_etag_parts())
+        return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag = self.get_etag()
+        last_modified = self.get_last_modified()
+        timestamp = last_modified and int(last_modified.timestamp())
+        response = None
+        # Версия, прочитанная с отстающей реплики, могла не измениться.
+        if may_cache():
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(timestamp)
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(self._drop_stale_etag)
+            else:
+                self._drop_stale_etag(response)
+        return response
+
+    @staticmethod
+    def _drop_stale_etag(response):
+        # Страница прочитана с реплики, а данные за это время изменились.
+        if not may_cache():
+            del response['ETag']
+            if response.has_header('Last-Modified'):
+                del response['Last-Modified']
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin):
+    """Условный GET ленты: версия — поколения её тегов кэша
+    (``get_cache_tags``), без запросов к БД"""
+
+    def get_etag_parts(self):
+        # Изменения публикаций, в том числе наступление отложенной
+        # публикации (blog.publishing), сбрасывают теги страницы.
+        tags = ('all', *self.get_cache_tags())
+        return get_generations(f'tag:{tag}' for tag in tags)
+
+
+class PageObjectMixin:
+    """Объект страницы (категория, профиль), загружаемый один раз за запрос"""
+
+    page_object_context_name = None
+
+    def get_page_object(self):
+        raise NotImplementedError(
+            'Определите get_page_object в дочернем классе')
+
+    @cached_property
+    def page_object(self):
+        return self.get_page_object()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context[self.page_object_context_name] = self.page_object
+        return context
+
+
+class FeedCountMixin:
+    """Подсчёт публикаций ленты с кэшированием для больших лент.
+
+    Число публикаций кэшируется под ``get_count_key`` и сбрасывается
+    тегами числа (``caching.count_tags``) при изменении состава ленты.
+    """
+
+    paginator_class = FeedPaginator
+
+    def get_count_key(self):
+        return self.request.path
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, count_key=self.get_count_key(),
+            count_tags=count_tags(self.get_cache_tags()), **kwargs)
+
+
+class CursorPaginationMixin:
+    """Курсорная пагинация ленты публикаций по (pub_date, id)"""
+
+    cursor_pagination = settings.POST_CURSOR_PAGINATION
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.cursor_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size,
+                                    ordering=self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class FeedTableMixin:
+    """Лента из таблицы FeedEntry.
+
+    Подсчёт и выбор страницы идут по узкой таблице без соединений, а
+    публикации страницы загружаются затем одним запросом по ключам.
+    Должен стоять в списке базовых классов раньше миксинов пагинации.
+    """
+
+    def get_feed_entries(self):
+        return FeedEntry.objects.all()
+
+    def get_queryset(self):
+        return self.get_feed_entries().only('pub_date').order_by(
+            '-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = (
+            super().paginate_queryset(queryset, page_size))
+        page.object_list = hydrate_posts(
+            object_list,
+            base_query_set(in_published_only=False, projection='card'))
+        return paginator, page, page.object_list, is_paginated
+
+
+class AnonymousPageCacheMixin:
+    """Кэш целой страницы для анонимных посетителей.
+
+    Запись сбрасывается сменой поколения любого из тегов страницы
+    (см. ``get_cache_tags``); наступление отложенной публикации тоже
+    меняет поколения — это делает blog.publishing.
+    """
+
+    page_cache_timeout = settings.ANONYMOUS_PAGE_CACHE_TIMEOUT
+
+    def get_cache_tags(self):
+        return ('feed',)
+
+    def dispatch(self, request, *args, **kwargs):
+        if (not self.page_cache_timeout
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request.get_full_path(), self.get_cache_tags())
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            response.add_post_render_callback(
+                lambda response: self._store_page(key, response))
+        return response
+
+    def _store_page(self, key, response):
+        if may_cache():
+            cache.set(key, (response.content, response['Content-Type']),
+                      self.page_cache_timeout)
@@ -1,55 +1,88 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.mail import send_mail
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import DetailView, ListView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
 
 from django.conf import settings
 from .query_functions import base_query_set
-from .view_mixins import OnlyAuthorMixin, BaseCommentMixin
-from .models import Post, Category
+from .replicas import pin_primary, replica_reads
+from .view_mixins import (OnlyAuthorMixin, BaseCommentMixin,
+                          AnonymousPageCacheMixin, ConditionalGetMixin,
+                          CursorPaginationMixin, FeedConditionalGetMixin,
+                          FeedCountMixin, FeedTableMixin, LimitedUploadMixin,
+                          PageObjectMixin, PostCommentsMixin)
+from .lookups import get_published_category
+from .models import FeedEntry, Post
+from .notifications import enqueue_comment_notification
+from .search import search_posts
 from .forms import PostForm, ProfileUpdateForm, CommentForm
 
 UserModel = get_user_model()
 POST_COUNT_LIMIT = settings.POST_COUNT_LIMIT
 
 
-class IndexPostsView(ListView):
+@method_decorator(replica_reads, name='dispatch')
+class IndexPostsView(FeedConditionalGetMixin, AnonymousPageCacheMixin,
+                     FeedTableMixin, CursorPaginationMixin, FeedCountMixin,
+                     ListView):
     """Главная страница"""
 
     template_name = 'blog/index.html'
     paginate_by = POST_COUNT_LIMIT
-    queryset = base_query_set()
 
 
-class CategoryPostsView(ListView):
+@method_decorator(replica_reads, name='dispatch')
+class CategoryPostsView(FeedConditionalGetMixin, AnonymousPageCacheMixin,
+                        FeedTableMixin, CursorPaginationMixin,
+                        FeedCountMixin, PageObjectMixin, ListView):
     """Все публикации в категории"""
 
-    model = Post
+    page_object_context_name = 'category'
     paginate_by = POST_COUNT_LIMIT
     template_name = 'blog/category.html'
 
-    def get_category(self):
-        """Получить категорию"""
-        return get_object_or_404(Category, is_published=True,
-                                 slug=self.kwargs['category_slug'])
+    def get_cache_tags(self):
+        return (f"category:{self.kwargs['category_slug']}",)
+
+    def get_page_object(self):
+        category = get_published_category(self.kwargs['category_slug'])
+        if category is None:
+            raise Http404('Категория не найдена')
+        return category
+
+    def get_feed_entries(self):
+        return FeedEntry.objects.filter(category=self.page_object)
+
+
+@method_decorator(replica_reads, name='dispatch')
+class SearchPostsView(ListView):
+    """Поиск по опубликованным публикациям"""
+
+    template_name = 'blog/search.html'
+    paginate_by = POST_COUNT_LIMIT
+
+    @property
+    def query(self):
+        return self.request.GET.get('q', '').strip()
 
     def get_queryset(self):
-        cur_category = self.get_category()
-        posts = base_query_set(cur_category.posts)
-        return posts
+        if not self.query:
+            return Post.objects.none()
+        return search_posts(base_query_set(projection='card'), self.query)
 
     def get_context_data(self, **kwargs):
-        cur_category = self.get_category()
         context = super().get_context_data(**kwargs)
-        context['category'] = cur_category
+        context['query'] = self.query
         return context
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+@method_decorator(pin_primary, name='dispatch')
+class PostCreateView(LimitedUploadMixin, LoginRequiredMixin, CreateView):
     """Создание публикации"""
 
     model = Post
@@ -68,28 +101,50 @@ class PostCreateView(LoginRequiredMixin, CreateView):
                                     self.request.user.username})
 
 
-class PostDetailView(DetailView):
+@method_decorator(replica_reads, name='dispatch')
+class PostDetailView(PostCommentsMixin, ConditionalGetMixin, DetailView):
     """Детали публикации"""
 
     template_name = 'blog/detail.html'
-    pk_url_kwarg = 'post_id'
-
-    def get_object(self, queryset=None):
-        cur_post = get_object_or_404(base_query_set(in_published_only=False),
-                                     id=self.kwargs['post_id'])
-        if cur_post.author != self.request.user:
-            cur_post = get_object_or_404(base_query_set(),
-                                         id=self.kwargs['post_id'])
-        return cur_post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = self.get_comments_page()
         return context
 
 
-class PostUpdateView(OnlyAuthorMixin, UpdateView):
+@method_decorator(replica_reads, name='dispatch')
+class PostCommentsView(PostCommentsMixin, ConditionalGetMixin, DetailView):
+    """Следующая страница комментариев: HTML-фрагмент или JSON"""
+
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments_page()
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        if self.request.GET.get('format') != 'json':
+            return super().render_to_response(context, **response_kwargs)
+        comments = context['comments']
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        })
+
+
+@method_decorator(pin_primary, name='dispatch')
+class PostUpdateView(LimitedUploadMixin, OnlyAuthorMixin, UpdateView):
     """Редактирование публикации"""
 
     model = Post
@@ -102,6 +157,7 @@ class PostUpdateView(OnlyAuthorMixin, UpdateView):
                             kwargs={'post_id': self.kwargs['post_id']})
 
 
+@method_decorator(pin_primary, name='dispatch')
 class PostDeleteView(OnlyAuthorMixin, DeleteView):
     """Удаление публикации"""
 
@@ -122,30 +178,39 @@ class PostDeleteView(OnlyAuthorMixin, DeleteView):
                                     self.request.user.username})
 
 
-class ProfileListView(ListView):
+@method_decorator(replica_reads, name='dispatch')
+class ProfileListView(FeedConditionalGetMixin, AnonymousPageCacheMixin,
+                      CursorPaginationMixin, FeedCountMixin,
+                      PageObjectMixin, ListView):
     """Страница пользователя"""
 
     model = Post
+    page_object_context_name = 'profile'
     template_name = 'blog/profile.html'
     paginate_by = POST_COUNT_LIMIT
 
+    def get_cache_tags(self):
+        return (f"author:{self.kwargs['cur_username']}",)
+
+    def get_page_object(self):
+        return get_object_or_404(UserModel,
+                                 username=self.kwargs['cur_username'])
+
+    def get_count_key(self):
+        # Автор видит и неопубликованные посты — у него своё число.
+        own = self.request.user == self.page_object
+        return f'{self.request.path}:{"own" if own else "public"}'
+
     def get_queryset(self):
-        cur_user = get_object_or_404(UserModel,
-                                     username=self.kwargs['cur_username'])
+        cur_user = self.page_object
         in_published_only = (self.request.user != cur_user)
         posts = base_query_set(cur_user.posts.all(),
-                               in_published_only=in_published_only)
+                               in_published_only=in_published_only,
+                               projection='card')
         return posts
 
-    def get_context_data(self, **kwargs):
-        cur_user = get_object_or_404(UserModel,
-                                     username=self.kwargs['cur_username'])
-
-        context = super().get_context_data(**kwargs)
-        context['profile'] = cur_user
-        return context
-
 
+@method_decorator(pin_primary, name='dispatch')
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     """Представление для редактирования профиля"""
 
@@ -162,6 +227,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
                                     self.request.user.username})
 
 
+@method_decorator(pin_primary, name='dispatch')
 class CommentCreateView(BaseCommentMixin, CreateView):
     """Создание комментария"""
 
@@ -173,20 +239,17 @@ class CommentCreateView(BaseCommentMixin, CreateView):
         form.instance.author = self.request.user
         cur_post = get_object_or_404(Post, pk=self.kwargs['post_id'])
         form.instance.post = cur_post
-        send_mail(
-            subject='Добавлен комментарий к вашей публикации.',
-            message=f'Добавлен комментарий к публикации {cur_post.title} !',
-            from_email=settings.FROM_EMAIL,
-            recipient_list=[cur_post.author.email],
-            # recipient_list=['voznaya.olga@yandex.ru'],
-            fail_silently=True,
-        )
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        # Письмо отправит фоновый обработчик очереди уведомлений.
+        enqueue_comment_notification(self.object)
+        return response
 
 
+@method_decorator(pin_primary, name='dispatch')
 class CommentUpdateView(OnlyAuthorMixin, BaseCommentMixin, UpdateView):
     """Редактирование комментария"""
 
 
+@method_decorator(pin_primary, name='dispatch')
 class CommentDeleteView(OnlyAuthorMixin, BaseCommentMixin, DeleteView):
     """Удаление комментария"""
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Задачи, которые можно выполнять в фоновых потоках процесса сервера
+TASKS = (
+    'blog.notifications.notification_task',
+    'blog.images.image_task',
+    'blog.publishing.publication_task',
+)
+
+
+class PeriodicTask:
+    """Задача, повторяемая фоновым обработчиком.
+
+    ``run`` возвращает число обработанных объектов. Пауза между запусками
+    берётся из настройки ``interval_setting``; ``next_delay``, если задан,
+    сокращает её до срока ближайшей работы. Настройка
+    ``in_process_setting`` разрешает поток в процессе сервера.
+    """
+
+    def __init__(self, name, run, interval_setting, in_process_setting,
+                 next_delay=None):
+        self.name = name
+        self.run = run
+        self.interval_setting = interval_setting
+        self.in_process_setting = in_process_setting
+        self.next_delay = next_delay
+
+    @property
+    def interval(self):
+        return getattr(settings, self.interval_setting)
+
+    @property
+    def in_process(self):
+        return getattr(settings, self.in_process_setting)
+
+    def delay(self, interval=None):
+        """Пауза до следующего запуска, секунды"""
+        interval = interval or self.interval
+        if self.next_delay is None:
+            return interval
+        return min(max(self.next_delay(), 0), interval)
+
+
+class PeriodicWorker(threading.Thread):
+    """Фоновый поток, выполняющий задачу внутри процесса сервера"""
+
+    def __init__(self, task):
+        super().__init__(name=task.name, daemon=True)
+        self.task = task
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wakeup.clear()
+            close_old_connections()
+            try:
+                self.task.run()
+                delay = self.task.delay()
+            except Exception:
+                logger.exception('Ошибка фонового обработчика %s', self.name)
+                delay = self.task.interval
+            self.wakeup.wait(delay)
+
+    def wake(self):
+        self.wakeup.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def start_workers():
+    """Запустить фоновые обработчики, разрешённые настройками"""
+    with _workers_lock:
+        for path in TASKS:
+            task = import_string(path)
+            if task.in_process and task.name not in _workers:
+                _workers[task.name] = worker = PeriodicWorker(task)
+                worker.start()
+    return list(_workers.values())
+
+
+def wake_worker(name):
+    """Запустить задачу обработчика досрочно, если он работает"""
+    worker = _workers.get(name)
+    if worker is not None:
+        worker.wake()
+
+
+class PeriodicCommandMixin:
+    """Команда, выполняющая задачу ``task`` один раз или в цикле (--loop).
+
+    Дочерний класс задаёт ``task`` и ``done_message`` и вызывает
+    ``run_periodically`` из ``handle``.
+    """
+
+    task = None
+    done_message = 'Обработано'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а повторять работу как фоновый процесс.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Наибольшая пауза между повторами, секунды (по умолчанию'
+                 f' — настройка {self.task.interval_setting}).'
+        )
+
+    def run_periodically(self, run, loop, interval):
+        while True:
+            done = run()
+            if done:
+                self.stdout.write(f'{self.done_message}: {done}')
+            if not loop:
+                return
+            time.sleep(self.task.delay(interval))
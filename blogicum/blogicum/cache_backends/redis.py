@@ -0,0 +1,120 @@
+import pickle
+import threading
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+# Клиенты по адресу сервера: у каждого свой пул соединений, общий для
+# потоков процесса
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def dumps(value):
+    # Целые числа хранятся как есть, чтобы incr выполнялся на сервере.
+    if type(value) is int:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def loads(value):
+    try:
+        return int(value)
+    except ValueError:
+        return pickle.loads(value)
+
+
+class RedisCache(BaseCache):
+    """Кэш в Redis или совместимом сервере (Valkey, KeyDB, Dragonfly).
+
+    Клиент — ``redis.Redis`` из пакета redis или класс (или путь к нему)
+    из ``OPTIONS['CLIENT_CLASS']`` с тем же интерфейсом, например
+    ``fakeredis.FakeRedis`` или заглушка в тестах. Остальные ``OPTIONS``
+    передаются в ``from_url``.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        self._server = server
+        options = dict(params.get('OPTIONS') or {})
+        self._client_class = options.pop('CLIENT_CLASS', 'redis.Redis')
+        self._client_options = options
+
+    @property
+    def client(self):
+        key = (self._client_class, self._server,
+               tuple(sorted(self._client_options.items())))
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client_class = self._client_class
+                if isinstance(client_class, str):
+                    client_class = import_string(client_class)
+                client = _clients[key] = client_class.from_url(
+                    self._server, **self._client_options)
+        return client
+
+    def get_backend_timeout(self, timeout=DEFAULT_TIMEOUT):
+        """Время жизни записи в секундах для Redis; None — бессрочно"""
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return None if timeout is None else max(0, int(timeout))
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout == 0:
+            return False
+        return bool(self.client.set(self._key(key, version), dumps(value),
+                                    ex=timeout, nx=True))
+
+    def get(self, key, default=None, version=None):
+        value = self.client.get(self._key(key, version))
+        return default if value is None else loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        timeout = self.get_backend_timeout(timeout)
+        if timeout == 0:
+            self.client.delete(key)
+        else:
+            self.client.set(key, dumps(value), ex=timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return bool(self.client.persist(key))
+        return bool(self.client.expire(key, timeout))
+
+    def delete(self, key, version=None):
+        return bool(self.client.delete(self._key(key, version)))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget([self._key(key, version) for key in keys])
+        return {key: loads(value) for key, value in zip(keys, values)
+                if value is not None}
+
+    def has_key(self, key, version=None):
+        return bool(self.client.exists(self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if not self.client.exists(key):
+            raise ValueError(f"Key '{key}' not found")
+        return self.client.incr(key, delta)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self):
+        self.client.flushdb()
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений процесса.
+
+    Одновременно выдаётся не больше ``max_size`` соединений; поток, которому
+    не хватило соединения, ждёт до ``timeout`` секунд. Возвращённые
+    соединения хранятся до ``max_idle`` секунд и перед повторной выдачей
+    проверяются функцией ``check``.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=10, max_idle=300,
+                 check=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check = check
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Свободное соединение из пула или новое"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f'Нет свободного соединения в пуле за {self.timeout} с')
+        try:
+            while True:
+                connection = self._pop_idle()
+                if connection is None:
+                    return self.connect()
+                if self._usable(connection):
+                    return connection
+                self._discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, discard=False):
+        """Вернуть соединение в пул (или закрыть испорченное)"""
+        try:
+            if discard:
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        """Закрыть простаивающие соединения"""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _pop_idle(self):
+        # Берётся последнее возвращённое соединение. Очередь упорядочена
+        # по времени возврата: если и оно простаивало дольше max_idle,
+        # устарели все.
+        with self._lock:
+            if not self._idle:
+                return None
+            connection, released_at = self._idle.pop()
+            if time.monotonic() - released_at <= self.max_idle:
+                return connection
+            stale = [connection, *(item for item, _ in self._idle)]
+            self._idle.clear()
+        for connection in stale:
+            self._discard(connection)
+        return None
+
+    def _usable(self, connection):
+        if self.check is None:
+            return True
+        try:
+            self.check(connection)
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _discard(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def ping(connection):
+    """Проверочный запрос через соединение драйвера"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+# Пулы процесса по псевдониму и имени базы
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PooledConnectionMixin:
+    """Пул соединений и проверка сохранённых соединений для бэкенда Django.
+
+    Параметры задаются в словаре базы в ``DATABASES``:
+
+    * ``POOL`` — ``MAX_SIZE`` (0 — без пула), ``TIMEOUT`` ожидания
+      свободного соединения и ``MAX_IDLE`` простоя, секунды. Закрытое
+      Django соединение возвращается в пул, поэтому при
+      ``CONN_MAX_AGE = 0`` поток держит его только на время запроса;
+    * ``HEALTH_CHECKS`` — перед первым запросом к БД в новом запросе
+      посетителя проверить сохранённое соединение и переоткрыть его, если
+      оно разорвано.
+    """
+
+    health_check_done = False
+
+    def pool_enabled(self):
+        return bool((self.settings_dict.get('POOL') or {}).get('MAX_SIZE'))
+
+    def get_pool(self, conn_params=None):
+        """Пул этой базы; None, если пул выключен"""
+        if not self.pool_enabled():
+            return None
+        key = (self.alias, str(self.settings_dict['NAME']))
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None and conn_params is not None:
+                options = self.settings_dict['POOL']
+                pool = _pools[key] = ConnectionPool(
+                    lambda: self.create_connection(conn_params),
+                    max_size=options['MAX_SIZE'],
+                    timeout=options.get('TIMEOUT', 10),
+                    max_idle=options.get('MAX_IDLE', 300),
+                    check=ping if self.settings_dict.get(
+                        'HEALTH_CHECKS') else None)
+        return pool
+
+    def create_connection(self, conn_params):
+        """Новое соединение драйвера"""
+        return super().get_new_connection(conn_params)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        if pool is None:
+            return self.create_connection(conn_params)
+        return pool.acquire()
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        discard = self.errors_occurred
+        if not discard:
+            # Незавершённая транзакция не должна достаться другому потоку.
+            try:
+                self.connection.rollback()
+            except Exception:
+                discard = True
+        pool.release(self.connection, discard=discard)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Соединение переходит в следующий запрос: проверить его там.
+        self.health_check_done = False
+
+    def ensure_connection(self):
+        if (self.connection is not None and not self.health_check_done
+                and self.settings_dict.get('HEALTH_CHECKS')
+                and not self.in_atomic_block):
+            self.health_check_done = True
+            try:
+                ping(self.connection)
+            except Exception:
+                self.errors_occurred = True
+                self.close()
+        super().ensure_connection()
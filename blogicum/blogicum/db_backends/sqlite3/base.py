@@ -0,0 +1,38 @@
+from django.db.backends.sqlite3 import base
+
+from ..pool import PooledConnectionMixin
+
+
+class DatabaseWrapper(PooledConnectionMixin, base.DatabaseWrapper):
+    """SQLite с пулом соединений и настройкой для конкурентной записи.
+
+    PRAGMA из ``pragmas`` (дополняются ключом ``PRAGMAS`` словаря базы)
+    выполняются при открытии соединения: журнал WAL позволяет читать во
+    время записи, а busy_timeout заставляет ждать блокировку вместо ошибки
+    «database is locked». Для базы в памяти пул и WAL не используются.
+    """
+
+    pragmas = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'busy_timeout': 5000,
+    }
+
+    def pool_enabled(self):
+        return not self.is_in_memory_db() and super().pool_enabled()
+
+    def create_connection(self, conn_params):
+        connection = super().create_connection(conn_params)
+        pragmas = {**self.pragmas, **self.settings_dict.get('PRAGMAS', {})}
+        if self.is_in_memory_db():
+            pragmas.pop('journal_mode', None)
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        # Транзакция сразу берёт блокировку записи: иначе при переходе
+        # от чтения к записи SQLite возвращает «database is locked», не
+        # дожидаясь busy_timeout.
+        self.cursor().execute('BEGIN IMMEDIATE')
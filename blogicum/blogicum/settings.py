@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.ScheduledPublicationMiddleware',
 
 ]
 
@@ -82,12 +84,92 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Параметры базы задаются переменными окружения DATABASE_*; по умолчанию —
+# файл SQLite рядом с проектом. Движки blogicum.db_backends (sqlite3,
+# postgresql) добавляют к стандартным пул соединений и проверку соединения.
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite3')
+# Пул соединений процесса: наибольшее число соединений (0 — без пула)
+DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 10))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': f'blogicum.db_backends.{DATABASE_ENGINE}',
+        'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': os.environ.get('DATABASE_USER', ''),
+        'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+        'HOST': os.environ.get('DATABASE_HOST', ''),
+        'PORT': os.environ.get('DATABASE_PORT', ''),
+        # Время жизни соединения потока, секунды. С пулом соединение
+        # возвращается в него после каждого запроса, без пула — живёт
+        # между запросами.
+        'CONN_MAX_AGE': int(os.environ.get(
+            'DATABASE_CONN_MAX_AGE', 0 if DATABASE_POOL_SIZE else 60)),
+        'HEALTH_CHECKS': os.environ.get(
+            'DATABASE_HEALTH_CHECKS', '1') == '1',
+        'POOL': {
+            'MAX_SIZE': DATABASE_POOL_SIZE,
+            'TIMEOUT': int(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+            'MAX_IDLE': int(os.environ.get('DATABASE_POOL_MAX_IDLE', 300)),
+        },
+    }
+}
+
+# Реплики только для чтения: псевдонимы из DATABASES, на которые
+# blog.replicas направляет чтение лент и страниц. Для локальной проверки
+# — копия файла БД, путь к которой задаёт DATABASE_REPLICA_NAME; прочие
+# параметры берутся у основной.
+DATABASE_REPLICAS = []
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DATABASE_REPLICA_NAME'],
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append('replica')
+
+DATABASE_ROUTERS = ['blog.replicas.ReplicaRouter']
+
+# Сколько секунд после изменения данных посетитель читает с основной БД,
+# чтобы сразу видеть свои правки
+DATABASE_PRIMARY_PIN_SECONDS = 10
+
+# Наибольшее отставание реплик в секундах: столько после сброса кэша
+# прочитанное с реплики не кэшируется и не получает ETag
+DATABASE_REPLICA_LAG = 10
+
+
+# Кэш задаётся переменными окружения CACHE_*: хранилище CACHE_BACKEND
+# (locmem, file, redis или memcached) и его адрес CACHE_LOCATION — каталог,
+# URL Redis или адрес memcached. CACHE_VERSION меняют, когда формат
+# записей становится несовместимым с прежним.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'blogicum'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache',
+             BASE_DIR / 'cache'),
+    'redis': ('blogicum.cache_backends.redis.RedisCache',
+              'redis://127.0.0.1:6379/0'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache',
+                  '127.0.0.1:11211'),
 }
+CACHE_BACKEND, CACHE_LOCATION = CACHE_BACKENDS[
+    os.environ.get('CACHE_BACKEND', 'locmem')]
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_LOCATION),
+        'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'blogicum'),
+        'VERSION': int(os.environ.get('CACHE_VERSION', 1)),
+        'TIMEOUT': 60 * 5,
+    }
+}
+
+# Вычисление записи кэша (blog.caching.get_or_compute): время, на которое
+# процесс захватывает пересчёт, сколько ждут другие процессы, когда
+# прежнего значения нет, и коэффициент раннего пересчёта (0 — выкл.)
+CACHE_LOCK_TIMEOUT = 30
+CACHE_LOCK_WAIT = 5
+CACHE_EARLY_RECOMPUTE_BETA = 1.0
 
 
 # Password validation
@@ -129,6 +211,15 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+if not DEBUG:
+    # Имена с хэшем содержимого и сжатые копии, см. blog.storage
+    STATICFILES_STORAGE = 'blog.storage.CompressedManifestStaticFilesStorage'
+
+# Отдавать статику из STATIC_ROOT самим приложением (если перед ним нет
+# веб-сервера, который делает это сам)
+SERVE_STATIC = False
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -141,6 +232,16 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = 'media/'
 
+# Отдача файлов через blog.serving: время кэширования в браузере для
+# обычных имён и для имён с хэшем содержимого, секунды
+FILE_MAX_AGE = 60 * 60
+FILE_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# Передача отдачи веб-серверу: None, 'x-sendfile' или 'x-accel-redirect';
+# для X-Accel-Redirect — внутренний location nginx, к которому
+# добавляется путь файла
+FILE_OFFLOAD = None
+FILE_ACCEL_PREFIX = '/protected/'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -150,5 +251,61 @@ LOGIN_REDIRECT_URL = 'blog:index'
 # Количество публикаций на странице
 POST_COUNT_LIMIT = 10
 
+# Количество комментариев на странице публикации
+COMMENT_COUNT_LIMIT = 20
+
+# Подсчёт публикаций в ленте: 'exact' — всегда COUNT(*), 'cached' — точное
+# число до POST_EXACT_COUNT_LIMIT, дальше кэшированное, 'estimated' — дальше
+# оценка планировщика PostgreSQL
+POST_COUNT_STRATEGY = 'cached'
+POST_EXACT_COUNT_LIMIT = 1000
+POST_COUNT_CACHE_TIMEOUT = 60 * 10
+
+# Курсорная пагинация лент публикаций вместо постраничной (без COUNT/OFFSET)
+POST_CURSOR_PAGINATION = False
+
+# Время хранения отрисованных карточек публикаций в кэше, секунды
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Время хранения страниц лент для анонимных посетителей, секунды (0 — выкл.)
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 60 * 5
+
+# Уменьшенные копии изображений публикаций:
+# ширины копий (каждая сохраняется в WebP и JPEG), атрибут sizes для <img>
+POST_IMAGE_WIDTHS = (320, 640, 960, 1280)
+POST_IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+# фоновый обработчик в процессе сервера: включён, период опроса
+POST_IMAGE_IN_PROCESS = False
+POST_IMAGE_INTERVAL = 30
+# Ограничения загружаемых изображений: размер файла в байтах,
+# число пикселей и допустимые форматы Pillow
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+# Отложенные публикации: наибольший срок хранения в кэше времени ближайшей
+# публикации, секунды; фоновый планировщик в процессе сервера
+POST_PUBLICATION_CHECK_INTERVAL = 60 * 5
+POST_PUBLICATION_IN_PROCESS = False
+
+# Поиск по публикациям: путь к классу бэкенда из blog.search. Если не
+# задан, выбирается по СУБД: FTS5 в SQLite, tsvector в PostgreSQL, поиск
+# подстрок в остальных
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND')
+
 # Адрес, с которого отправляется корреспонденция
 FROM_EMAIL = 'blog@blogicum.not'
+
+# Очередь уведомлений о комментариях:
+# размер пачки, отправляемой через одно соединение с почтовым сервером
+COMMENT_NOTIFICATION_BATCH_SIZE = 100
+# число попыток и паузы между ними (секунды, удваиваются с каждой попыткой)
+COMMENT_NOTIFICATION_MAX_ATTEMPTS = 8
+COMMENT_NOTIFICATION_RETRY_DELAY = 60
+COMMENT_NOTIFICATION_MAX_RETRY_DELAY = 60 * 60 * 6
+# время, на которое обработчик захватывает пачку, секунды
+COMMENT_NOTIFICATION_LEASE = 60 * 5
+# фоновый обработчик в процессе сервера: включён, период опроса, потоки
+COMMENT_NOTIFICATION_IN_PROCESS = False
+COMMENT_NOTIFICATION_INTERVAL = 10
+COMMENT_NOTIFICATION_THREADS = 2
@@ -1,14 +1,21 @@
+import re
+
 from django.contrib import admin
-from django.urls import include, path
-from django.conf.urls.static import static
+from django.urls import include, path, re_path
 
 from django.conf import settings
 
+from blog import serving
 from pages import views
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
+
+def file_url(prefix):
+    return rf'^{re.escape(prefix.lstrip("/"))}(?P<path>.*)$'
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('blog.urls')),
@@ -18,4 +25,9 @@ urlpatterns = [
         'auth/registration/', views.CreateRegistrationView.as_view(),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(file_url(settings.MEDIA_URL), serving.serve_media),
+]
+
+if settings.SERVE_STATIC:
+    urlpatterns.append(
+        re_path(file_url(settings.STATIC_URL), serving.serve_static))
@@ -1,16 +1,21 @@
 from django.contrib.auth.forms import UserCreationForm
 from django.shortcuts import render
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 from django.views.generic.edit import CreateView
 
+from blog.replicas import replica_reads
 
+
+@method_decorator(replica_reads, name='dispatch')
 class AboutView(TemplateView):
     """О проекте"""
 
     template_name = 'pages/about.html'
 
 
+@method_decorator(replica_reads, name='dispatch')
 class RulesView(TemplateView):
     """Правила"""
 
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from blog.caching import get_or_compute, get_or_compute_tagged
+from blog.models import Category
+from blogicum.cache_backends.redis import RedisCache
+
+
+class FakeRedis:
+    """Заглушка клиента Redis в памяти процесса"""
+
+    def __init__(self):
+        self.data = {}
+
+    @classmethod
+    def from_url(cls, url, **options):
+        return cls()
+
+    def _alive(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def get(self, key):
+        return self._alive(key)
+
+    def mget(self, keys):
+        return [self._alive(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key) is not None:
+            return None
+        if isinstance(value, int):
+            value = str(value).encode()
+        self.data[key] = (value, ex and time.time() + ex)
+        return True
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def exists(self, key):
+        return int(self._alive(key) is not None)
+
+    def incr(self, key, delta):
+        value = int(self._alive(key)) + delta
+        self.data[key] = (str(value).encode(), self.data[key][1])
+        return value
+
+    def expire(self, key, seconds):
+        if self._alive(key) is None:
+            return False
+        self.data[key] = (self.data[key][0], time.time() + seconds)
+        return True
+
+    def persist(self, key):
+        return self.expire(key, float("inf"))
+
+    def flushdb(self):
+        self.data.clear()
+
+
+def test_redis_backend():
+    redis_cache = RedisCache("redis://stand-in/0", {
+        "OPTIONS": {"CLIENT_CLASS": FakeRedis}, "KEY_PREFIX": "test",
+    })
+    redis_cache.set("card", {"html": "<p>"})
+    assert redis_cache.get("card") == {"html": "<p>"}
+    assert not redis_cache.add("card", "other")
+    redis_cache.set("generation", 7, None)
+    assert redis_cache.incr("generation") == 8, (
+        "Убедитесь, что целые числа увеличиваются на сервере Redis."
+    )
+    assert redis_cache.get_many(["card", "generation", "missing"]) == {
+        "card": {"html": "<p>"}, "generation": 8,
+    }
+    with pytest.raises(ValueError):
+        redis_cache.incr("missing")
+    assert redis_cache.delete("card")
+    assert redis_cache.get("card", "default") == "default"
+
+
+def test_value_is_computed_once():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert get_or_compute("key", compute, 60) == "value"
+    assert get_or_compute("key", compute, 60) == "value"
+    assert len(calls) == 1
+
+
+def test_stale_value_served_during_recompute(settings):
+    settings.CACHE_EARLY_RECOMPUTE_BETA = 0
+    get_or_compute("key", lambda: "old", 0.1)
+    entry = cache.get("key")
+    cache.set("key", (entry[0], entry[1], time.time() - 1))
+    # Пересчёт уже идёт в другом процессе.
+    cache.add("lock:key", 1)
+    assert get_or_compute("key", lambda: "new", 60) == "old", (
+        "Убедитесь, что пока запись пересчитывает другой процесс, отдаётся"
+        " прежнее значение."
+    )
+    cache.delete("lock:key")
+    assert get_or_compute("key", lambda: "new", 60) == "new"
+
+
+@pytest.mark.django_db
+def test_model_change_invalidates(published_category):
+    def cached(value):
+        return get_or_compute_tagged("value", (), lambda: value, 60,
+                                     models=(Category,))
+
+    assert cached("old") == "old"
+    assert cached("new") == "old"
+    published_category.title = "Новое название"
+    published_category.save()
+    assert cached("new") == "new", (
+        "Убедитесь, что изменение объекта модели сбрасывает зависящие от"
+        " неё записи кэша."
+    )
@@ -0,0 +1,55 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def comment_count(post):
+    post.refresh_from_db(fields=["comment_count"])
+    return post.comment_count
+
+
+def test_comment_count_follows_comments(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": text})
+        assert response.status_code == 302
+    assert comment_count(post) == 2, (
+        "Убедитесь, что добавление комментария увеличивает счётчик"
+        " комментариев публикации."
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    response = user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert response.status_code == 302
+    assert comment_count(post) == 1, (
+        "Убедитесь, что удаление комментария уменьшает счётчик комментариев"
+        " публикации."
+    )
+
+
+def test_recount_comments_fixes_corrupted_count(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+
+    out = StringIO()
+    call_command("recount_comments", "--dry-run", stdout=out)
+    assert "Найдено неверных счётчиков: 1" in out.getvalue()
+    assert comment_count(post) == 42
+
+    call_command("recount_comments", stdout=StringIO())
+    assert comment_count(post) == 3, (
+        "Убедитесь, что команда recount_comments исправляет неверный"
+        " счётчик комментариев."
+    )
@@ -0,0 +1,53 @@
+import pytest
+from django.conf import settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location, user):
+    return mixer.cycle(settings.COMMENT_COUNT_LIMIT + 5).blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+
+
+def test_detail_shows_first_comment_page(
+        client, post_with_published_location, many_comments
+):
+    response = client.get(f"/posts/{post_with_published_location.id}/")
+    comments = response.context["comments"]
+    assert len(comments) == settings.COMMENT_COUNT_LIMIT, (
+        "Убедитесь, что на странице публикации показывается только первая"
+        " страница комментариев."
+    )
+    assert comments.has_next()
+
+
+def test_more_comments_fragment_and_json(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    first = client.get(f"/posts/{post.id}/").context["comments"]
+    url = f"/posts/{post.id}/comments/?cursor={first.next_cursor}"
+
+    fragment = client.get(url)
+    assert fragment.status_code == 200
+    rest = fragment.context["comments"]
+    assert [comment.id for comment in rest] == [
+        comment.id for comment in many_comments[settings.COMMENT_COUNT_LIMIT:]
+    ], "Убедитесь, что следующая страница продолжает список комментариев."
+    assert not rest.has_next()
+
+    data = client.get(f"{url}&format=json").json()
+    assert [item["id"] for item in data["comments"]] == [
+        comment.id for comment in rest
+    ]
+    assert data["next_cursor"] is None
+
+
+def test_comments_of_hidden_post_not_found(
+        another_user_client, unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == 404
@@ -0,0 +1,65 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_detail_not_modified(
+        client, django_assert_num_queries, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified")
+
+    # Только выборка публикации, без комментариев и шаблона.
+    with django_assert_num_queries(1):
+        cached = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert cached.status_code == 304, (
+        "Убедитесь, что страница публикации отвечает 304 на запрос с"
+        " актуальным ETag."
+    )
+    cached = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert cached.status_code == 304
+
+
+def test_post_detail_etag_changes_with_comments(
+        mixer, user, client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    comment = mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag страницы публикации."
+    )
+    etag = client.get(url)["ETag"]
+    comment.text = "Исправленный комментарий"
+    comment.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_feed_not_modified_until_post_changes(
+        client, user_client, many_posts_with_published_locations
+):
+    etag = client.get("/")["ETag"]
+    assert client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert user_client.get(
+        "/", HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что ETag ленты зависит от посетителя."
+    )
+
+    post = many_posts_with_published_locations[0]
+    post.title = "Новый заголовок"
+    post.save()
+    assert client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что изменение публикации меняет ETag ленты."
+    )
+
+
+def test_post_detail_rejects_post_method(client, post_with_published_location):
+    post_id = post_with_published_location.id
+    for url in (f"/posts/{post_id}/", f"/posts/{post_id}/comments/"):
+        assert client.post(url).status_code == 405, (
+            "Убедитесь, что страница публикации отвечает 405 на POST-запрос."
+        )
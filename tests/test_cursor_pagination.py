@@ -0,0 +1,43 @@
+import pytest
+
+from blog.views import IndexPostsView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cursor_index(monkeypatch):
+    monkeypatch.setattr(IndexPostsView, "cursor_pagination", True)
+
+
+def test_cursor_pagination_walks_feed(
+        cursor_index, client, many_posts_with_published_locations
+):
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+
+    first = client.get("/").context["page_obj"]
+    assert [post.id for post in first] == [
+        post.id for post in expected[:N_PER_PAGE]
+    ], "Убедитесь, что первая страница ленты совпадает с началом ленты."
+    assert first.has_next() and not first.has_previous()
+
+    second = client.get(f"/?cursor={first.next_cursor}").context["page_obj"]
+    assert [post.id for post in second] == [
+        post.id for post in expected[N_PER_PAGE:N_PER_PAGE * 2]
+    ], "Убедитесь, что курсор ведёт на следующую страницу ленты."
+    assert second.has_previous()
+
+    back = client.get(
+        f"/?cursor={second.previous_cursor}").context["page_obj"]
+    assert [post.id for post in back] == [post.id for post in first], (
+        "Убедитесь, что курсор назад возвращает на предыдущую страницу."
+    )
+
+
+def test_invalid_cursor_is_not_found(cursor_index, client):
+    assert client.get("/?cursor=not-a-cursor").status_code == 404
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+
+from blogicum.db_backends.pool import ConnectionPool
+
+
+def file_database(path, **options):
+    handler = ConnectionHandler({
+        "default": {
+            "ENGINE": "blogicum.db_backends.sqlite3",
+            "NAME": str(path),
+            "POOL": {"MAX_SIZE": 2, "TIMEOUT": 1},
+            "HEALTH_CHECKS": True,
+            **options,
+        },
+    })
+    return handler["default"]
+
+
+def test_pool_is_bounded():
+    pool = ConnectionPool(lambda: sqlite3.connect(":memory:"),
+                          max_size=1, timeout=0.01)
+    connection = pool.acquire()
+    with pytest.raises(OperationalError):
+        pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection, (
+        "Убедитесь, что возвращённое соединение выдаётся повторно."
+    )
+
+
+def test_pool_drops_broken_connections():
+    pool = ConnectionPool(lambda: sqlite3.connect(":memory:"),
+                          check=lambda connection: connection.execute(
+                              "SELECT 1"))
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.close()
+    assert pool.acquire() is not connection, (
+        "Убедитесь, что разорванное соединение не выдаётся из пула."
+    )
+
+
+# Блокировку доступа к БД pytest-django снимает только эта метка.
+@pytest.mark.django_db
+def test_sqlite_pragmas_and_pool(tmp_path):
+    database = file_database(tmp_path / "db.sqlite3")
+    with database.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 5000
+        cursor.execute("PRAGMA synchronous")
+        # NORMAL
+        assert cursor.fetchone()[0] == 1
+    raw = database.connection
+    database.close()
+    database.connect()
+    assert database.connection is raw, (
+        "Убедитесь, что закрытое соединение возвращается в пул."
+    )
+    database.close()
+
+
+@pytest.mark.django_db
+def test_in_memory_database_skips_pool():
+    database = file_database(":memory:")
+    assert database.get_pool() is None
+    with database.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "memory"
@@ -0,0 +1,62 @@
+import pytest
+from django.test import override_settings
+
+from blog.models import FeedEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+def paginator_count(client):
+    return client.get("/").context["paginator"].count
+
+
+@override_settings(POST_EXACT_COUNT_LIMIT=5)
+def test_large_feed_count_is_cached(
+        user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    assert paginator_count(user_client) == len(posts)
+
+    FeedEntry.objects.filter(pk=posts[0].pk).delete()
+    assert paginator_count(user_client) == len(posts), (
+        "Убедитесь, что число публикаций большой ленты берётся из кэша."
+    )
+
+    posts[1].delete()
+    assert paginator_count(user_client) == len(posts) - 2, (
+        "Убедитесь, что кэшированное число публикаций сбрасывается при"
+        " изменении ленты."
+    )
+
+
+def test_small_feed_count_is_exact(
+        user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    assert paginator_count(user_client) == len(posts)
+    FeedEntry.objects.filter(pk=posts[0].pk).delete()
+    assert paginator_count(user_client) == len(posts) - 1
+
+
+@override_settings(POST_EXACT_COUNT_LIMIT=5)
+def test_feed_count_survives_edits_and_comments(
+        mixer, user, user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    assert paginator_count(user_client) == len(posts)
+
+    FeedEntry.objects.filter(pk=posts[0].pk).delete()
+    mixer.blend("blog.Comment", post=posts[1], author=user)
+    posts[2].title = "Новый заголовок"
+    posts[2].save()
+    assert paginator_count(user_client) == len(posts), (
+        "Убедитесь, что комментарии и правки публикаций не сбрасывают"
+        " кэшированное число публикаций ленты."
+    )
+
+    posts[3].is_published = False
+    posts[3].save()
+    assert paginator_count(user_client) == len(posts) - 2, (
+        "Убедитесь, что снятие публикации с ленты сбрасывает кэшированное"
+        " число публикаций."
+    )
@@ -0,0 +1,17 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_queries_use_indexes(many_posts_with_published_locations):
+    out = StringIO()
+    call_command("check_feed_plans", stdout=out)
+    output = out.getvalue()
+    assert "Все запросы используют индексы." in output, (
+        "Убедитесь, что запросы лент и комментариев используют индексы."
+    )
+    assert "USING INDEX feed_entry_idx" in output
+    assert "USING INDEX comment_post_created_idx" in output
@@ -0,0 +1,52 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import FeedEntry
+
+pytestmark = [pytest.mark.django_db]
+
+
+def entry_ids():
+    return set(FeedEntry.objects.values_list("pk", flat=True))
+
+
+def test_feed_follows_post_changes(post_with_published_location):
+    post = post_with_published_location
+    assert entry_ids() == {post.pk}, (
+        "Убедитесь, что видимая публикация попадает в таблицу лент."
+    )
+    post.is_published = False
+    post.save()
+    assert entry_ids() == set(), (
+        "Убедитесь, что снятая с публикации запись удаляется из лент."
+    )
+    post.is_published = True
+    post.save()
+    post.delete()
+    assert entry_ids() == set()
+
+
+def test_feed_follows_category(many_posts_with_published_locations):
+    posts = many_posts_with_published_locations
+    category = posts[0].category
+    in_category = {post.pk for post in posts if post.category == category}
+    category.is_published = False
+    category.save()
+    assert not entry_ids() & in_category, (
+        "Убедитесь, что при снятии категории с публикации её посты"
+        " удаляются из таблицы лент."
+    )
+    category.is_published = True
+    category.save()
+    assert entry_ids() >= in_category
+
+
+def test_rebuild_feed_command(many_posts_with_published_locations):
+    FeedEntry.objects.all().delete()
+    out = StringIO()
+    call_command("rebuild_feed", stdout=out)
+    assert entry_ids() == {
+        post.pk for post in many_posts_with_published_locations
+    }
@@ -0,0 +1,90 @@
+import gzip
+
+import pytest
+
+from blog.storage import CompressedManifestStaticFilesStorage
+
+HASHED_NAME = "posts_images/ab/cd/" + "abcd" * 16 + ".txt"
+CONTENT = b"0123456789" * 100
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    for name in ("plain.txt", HASHED_NAME):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(CONTENT)
+    return tmp_path
+
+
+def test_media_file_is_served_with_validators(client):
+    response = client.get("/media/plain.txt")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" not in response["Cache-Control"]
+
+    cached = client.get("/media/plain.txt",
+                        HTTP_IF_NONE_MATCH=response["ETag"])
+    assert cached.status_code == 304, (
+        "Убедитесь, что при совпадении ETag файл не передаётся повторно."
+    )
+
+
+def test_content_addressed_name_is_immutable(client):
+    response = client.get(f"/media/{HASHED_NAME}")
+    assert "immutable" in response["Cache-Control"]
+
+
+@pytest.mark.parametrize(
+    "header, status, body",
+    [
+        ("bytes=10-19", 206, CONTENT[10:20]),
+        ("bytes=-5", 206, CONTENT[-5:]),
+        ("bytes=990-", 206, CONTENT[990:]),
+        ("bytes=5000-", 416, b""),
+    ],
+)
+def test_range_requests(client, header, status, body):
+    response = client.get("/media/plain.txt", HTTP_RANGE=header)
+    assert response.status_code == status
+    content = (b"".join(response.streaming_content)
+               if response.streaming else response.content)
+    assert content == body
+
+
+def test_precompressed_copy_is_preferred(client, media_root):
+    (media_root / "plain.txt.gz").write_bytes(gzip.compress(CONTENT))
+    response = client.get("/media/plain.txt", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(response.streaming_content)) == CONTENT
+
+
+@pytest.mark.parametrize(
+    "offload, header, value",
+    [
+        ("x-accel-redirect", "X-Accel-Redirect", "/protected/media/plain.txt"),
+        ("x-sendfile", "X-Sendfile", None),
+    ],
+)
+def test_offload_to_web_server(client, settings, media_root,
+                               offload, header, value):
+    settings.FILE_OFFLOAD = offload
+    response = client.get("/media/plain.txt")
+    assert response.content == b""
+    assert response[header] == (value or str(media_root / "plain.txt"))
+
+
+def test_missing_and_outside_files_are_not_found(client):
+    assert client.get("/media/missing.txt").status_code == 404
+    assert client.get("/media/../settings.py").status_code == 404
+
+
+def test_static_storage_writes_compressed_copies(tmp_path):
+    storage = CompressedManifestStaticFilesStorage(location=tmp_path)
+    (tmp_path / "style.css").write_bytes(b"body { color: red; }\n" * 50)
+    storage.compress("style.css")
+    assert gzip.decompress((tmp_path / "style.css.gz").read_bytes()) == (
+        b"body { color: red; }\n" * 50
+    )
@@ -0,0 +1,76 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_jpeg(size=(100, 100)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(buffer, "JPEG")
+    return SimpleUploadedFile(
+        "upload.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+
+def create_post(client, category, image):
+    return client.post("/posts/create/", data={
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2020-01-01T00:00",
+        "category": category.pk,
+        "image": image,
+    })
+
+
+def test_upload_within_limits_is_saved(
+        settings, user_client, published_category):
+    create_post(user_client, published_category, make_jpeg())
+    post = Post.objects.get()
+    assert post.image, "Убедитесь, что допустимое изображение сохраняется."
+
+
+@pytest.mark.parametrize(
+    "limit",
+    [{"POST_IMAGE_MAX_BYTES": 100}, {"POST_IMAGE_MAX_PIXELS": 100 * 99}],
+)
+def test_upload_over_limit_is_rejected(
+        settings, user_client, published_category, limit):
+    for name, value in limit.items():
+        setattr(settings, name, value)
+    response = create_post(user_client, published_category, make_jpeg())
+    assert response.status_code == 200
+    assert response.context["form"].has_error("image"), (
+        "Убедитесь, что изображение сверх ограничений размера отклоняется"
+        " формой публикации."
+    )
+    assert not Post.objects.exists()
+
+
+def test_not_an_image_is_rejected(user_client, published_category):
+    response = create_post(
+        user_client, published_category,
+        SimpleUploadedFile("fake.jpg", b"not an image"))
+    assert response.context["form"].has_error("image", "invalid_image")
+
+
+def test_post_form_keeps_csrf_check(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = create_post(client, published_category, make_jpeg())
+    assert response.status_code == 403, (
+        "Убедитесь, что форма публикации по-прежнему проверяет токен CSRF."
+    )
+    assert not Post.objects.exists()
+
+
+def test_limited_handler_only_on_post_forms(settings):
+    assert not any("Limited" in handler
+                   for handler in settings.FILE_UPLOAD_HANDLERS), (
+        "Убедитесь, что обрезающий обработчик загрузки не установлен для"
+        " всех представлений: обычное ImageField примет обрезанный файл."
+    )
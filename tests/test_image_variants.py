@@ -0,0 +1,101 @@
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import build_pending_variants, delete_variants, pending_posts
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def remove_variants():
+    yield
+    for post in Post.objects.exclude(image_variants={}):
+        delete_variants(post.image.storage, post.image_variants)
+
+
+def test_variants_built_and_rendered(client, post_with_published_location):
+    post = post_with_published_location
+    assert pending_posts().filter(pk=post.pk).exists()
+
+    assert build_pending_variants() == 1
+    post.refresh_from_db()
+    assert (post.image_variants["width"], post.image_variants["height"]) == (
+        100, 100
+    )
+    types = {variant["type"] for variant in post.image_variants["variants"]}
+    assert types == {"image/webp", "image/jpeg"}, (
+        "Убедитесь, что уменьшенные копии создаются в WebP и JPEG."
+    )
+
+    soup = BeautifulSoup(client.get("/").content, features="html.parser")
+    img = soup.find("img", srcset=True)
+    assert img is not None and img["width"] == "100", (
+        "Убедитесь, что карточка публикации выводит srcset и размеры"
+        " изображения."
+    )
+    assert soup.find("source", type="image/webp") is not None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_replacing_image_removes_variants(post_with_published_location):
+    post = post_with_published_location
+    build_pending_variants()
+    post.refresh_from_db()
+    storage = post.image.storage
+    names = [variant["name"] for variant in post.image_variants["variants"]]
+    post.image = None
+    post.save()
+    assert post.image_variants == {}
+    assert not any(storage.exists(name) for name in names), (
+        "Убедитесь, что при замене изображения старые копии удаляются."
+    )
+
+
+def test_original_is_stripped_of_exif(post_with_published_location):
+    post = post_with_published_location
+    exif = Image.Exif()
+    exif[0x010F] = "Phone"
+    # Ориентация 6: изображение нужно повернуть на 90° по часовой стрелке.
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    Image.new("RGB", (100, 50)).save(buffer, "JPEG", exif=exif)
+    post.image.save("phone.jpg", ContentFile(buffer.getvalue()))
+    original = post.image.name
+
+    build_pending_variants()
+    post.refresh_from_db()
+    assert post.image.name != original
+    assert post.image.name == post.image_variants["source"]
+    assert "/variants/" not in post.image.name
+    assert not post.image.storage.exists(original)
+    with post.image.open() as image_file, Image.open(image_file) as image:
+        assert not image.getexif(), (
+            "Убедитесь, что оригинал пересохраняется без метаданных EXIF."
+        )
+        assert image.size == (50, 100)
+
+
+def test_rebuild_keeps_original(post_with_published_location):
+    post = post_with_published_location
+    build_pending_variants()
+    post.refresh_from_db()
+    original = post.image.name
+    with post.image.open() as image_file:
+        content = image_file.read()
+
+    call_command("build_image_variants", "--rebuild", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image.name == original
+    with post.image.open() as image_file:
+        assert image_file.read() == content, (
+            "Убедитесь, что пересоздание копий не пересохраняет оригинал."
+        )
+    assert post.image_variants["variants"]
+    assert all(post.image.storage.exists(variant["name"])
+               for variant in post.image_variants["variants"])
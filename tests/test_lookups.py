@@ -0,0 +1,58 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from blog.lookups import get_published_category, refresh_tables
+from blog.query_functions import base_query_set
+from blog.replicas import replica_reads
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_published_category_by_slug(published_category):
+    slug = published_category.slug
+    assert get_published_category(slug) == published_category
+    published_category.is_published = False
+    published_category.save()
+    assert get_published_category(slug) is None, (
+        "Убедитесь, что снятая с публикации категория пропадает из таблицы"
+        " в памяти процесса."
+    )
+
+
+def test_renamed_category_is_reloaded(published_category):
+    get_published_category(published_category.slug)
+    published_category.title = "Новое название"
+    published_category.save()
+    category = get_published_category(published_category.slug)
+    assert category.title == "Новое название"
+
+
+def test_feed_attaches_lookups(
+        django_assert_num_queries, many_posts_with_published_locations
+):
+    refresh_tables()
+    with django_assert_num_queries(1):
+        cards = [(post.category.title, post.location.name)
+                 for post in base_query_set()]
+    assert len(cards) == len(many_posts_with_published_locations), (
+        "Убедитесь, что категории и места публикаций подставляются из"
+        " памяти процесса без дополнительных запросов."
+    )
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+def test_tables_reload_from_primary(published_category):
+    @replica_reads
+    def view(request):
+        # Псевдонима replica нет в DATABASES: чтение с него упадёт.
+        category = get_published_category(published_category.slug)
+        return HttpResponse(category.title)
+
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    assert view(request).content.decode() == published_category.title, (
+        "Убедитесь, что таблицы в памяти процесса перечитываются с"
+        " основной БД, а не с реплики."
+    )
@@ -0,0 +1,74 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def jpeg_content(color=(73, 109, 137)):
+    buffer = BytesIO()
+    Image.new("RGB", (100, 100), color=color).save(buffer, "JPEG")
+    return ContentFile(buffer.getvalue())
+
+
+def media_files(root):
+    return sorted(path for path in root.rglob("*") if path.is_file())
+
+
+@pytest.fixture
+def two_posts(mixer, user, published_category):
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category, image=None)
+    for post in posts:
+        post.image.save("photo.jpg", jpeg_content())
+    return posts
+
+
+def test_same_content_is_stored_once(two_posts, media_root):
+    first, second = two_posts
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения сохраняются в один файл."
+    )
+    assert len(media_files(media_root)) == 1
+
+
+def test_file_is_removed_with_last_reference(two_posts, media_root):
+    first, second = two_posts
+    first.delete()
+    assert first.image.storage.exists(second.image.name), (
+        "Убедитесь, что файл, на который ссылается другая публикация,"
+        " не удаляется вместе с публикацией."
+    )
+    second.delete()
+    assert media_files(media_root) == [], (
+        "Убедитесь, что файл удаляется вместе с последней публикацией."
+    )
+
+
+def test_replaced_image_is_released(two_posts, media_root):
+    first, second = two_posts
+    old_name = first.image.name
+    first.image.save("photo.jpg", jpeg_content(color=(0, 0, 0)))
+    second.image.save("photo.jpg", jpeg_content(color=(0, 0, 0)))
+    assert not first.image.storage.exists(old_name)
+    assert len(media_files(media_root)) == 1
+
+
+def test_collect_orphan_media(two_posts, media_root):
+    storage = Post._meta.get_field("image").storage
+    orphan = storage.save("posts_images/orphan.jpg",
+                          jpeg_content(color=(0, 0, 0)))
+    call_command("collect_orphan_media", min_age=0, stdout=StringIO())
+    assert not storage.exists(orphan)
+    assert storage.exists(two_posts[0].image.name)
@@ -0,0 +1,66 @@
+import pytest
+from django.core import mail
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import CommentNotification
+from blog.notifications import drain_notifications
+
+pytestmark = [pytest.mark.django_db]
+
+LOCMEM_EMAIL = "django.core.mail.backends.locmem.EmailBackend"
+
+
+@pytest.fixture
+def post_of_author_with_email(post_of_another_author, another_user):
+    another_user.email = "author@blogicum.not"
+    another_user.save()
+    return post_of_another_author
+
+
+def test_comment_is_queued_not_sent(user_client, post_of_author_with_email):
+    post = post_of_author_with_email
+    with override_settings(EMAIL_BACKEND=LOCMEM_EMAIL):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": "Первый"})
+        assert len(mail.outbox) == 0, (
+            "Убедитесь, что письмо не отправляется во время запроса."
+        )
+    assert CommentNotification.objects.filter(post=post).count() == 1
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_EMAIL)
+def test_comments_coalesced_into_digest(
+        user_client, post_of_author_with_email
+):
+    post = post_of_author_with_email
+    for text in ("Первый", "Второй", "Третий"):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": text})
+
+    assert drain_notifications() == 1
+    assert len(mail.outbox) == 1, (
+        "Убедитесь, что несколько комментариев к одной публикации"
+        " объединяются в одно письмо."
+    )
+    assert mail.outbox[0].to == ["author@blogicum.not"]
+    assert not CommentNotification.objects.filter(
+        sent_at__isnull=True).exists()
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM_EMAIL)
+def test_send_error_postpones_notification(
+        monkeypatch, user_client, post_of_author_with_email
+):
+    post = post_of_author_with_email
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Первый"})
+
+    def fail(self, *args, **kwargs):
+        raise ConnectionError("SMTP недоступен")
+
+    monkeypatch.setattr(mail.EmailMessage, "send", fail)
+    assert drain_notifications() == 0
+    notification = CommentNotification.objects.get(post=post)
+    assert notification.sent_at is None
+    assert notification.attempts == 1
+    assert notification.next_attempt_at > timezone.now(), (
+        "Убедитесь, что неудачная отправка откладывается на потом."
+    )
@@ -0,0 +1,35 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_page_is_cached_until_post_changes(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in client.get("/").content.decode("utf-8")
+
+    Post.objects.filter(pk=post.pk).update(title="Без сигналов")
+    assert post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что анонимным посетителям страница отдаётся из кэша."
+    )
+
+    post.title = "Изменено автором"
+    post.save()
+    assert post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что кэш страницы сбрасывается при изменении публикации."
+    )
+
+
+def test_authenticated_page_is_not_cached(
+        client, user_client, post_with_published_location
+):
+    client.get("/")
+    assert client.get("/").context is None
+    assert user_client.get("/").context is not None, (
+        "Убедитесь, что авторизованным пользователям страница не отдаётся"
+        " из кэша."
+    )
+
@@ -0,0 +1,36 @@
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+
+def render_paginator(n_pages, number):
+    page_obj = Paginator(range(n_pages * 10), 10).page(number)
+    return render_to_string(
+        "includes/paginator.html", {"page_obj": page_obj}
+    )
+
+
+def test_paginator_html_independent_of_page_count():
+    small = render_paginator(50, 25)
+    huge = render_paginator(100000, 50000)
+    assert small.count("page-item") == huge.count("page-item"), (
+        "Убедитесь, что пагинатор показывает ограниченное окно номеров"
+        " страниц, а не ссылку на каждую страницу."
+    )
+    assert "100000" in huge and "50001" in huge and "…" in huge
+
+
+class WholeRangePaginator(Paginator):
+    @property
+    def page_range(self):
+        raise AssertionError(
+            "Убедитесь, что пагинатор не перебирает номера всех страниц."
+        )
+
+
+def test_paginator_does_not_walk_all_pages():
+    page_obj = WholeRangePaginator(range(1000000), 10).page(50000)
+    html = render_to_string(
+        "includes/paginator.html", {"page_obj": page_obj}
+    )
+    assert html.count("page-item") == render_paginator(50, 25).count(
+        "page-item")
@@ -0,0 +1,82 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_cache_invalidation(
+        client, post_with_published_location, published_category
+):
+    post = post_with_published_location
+    assert post.title in client.get("/").content.decode("utf-8")
+
+    published_category.title = "Переименованная категория"
+    published_category.save()
+    assert published_category.title in client.get("/").content.decode(
+        "utf-8"
+    ), (
+        "Убедитесь, что карточки публикаций обновляются после изменения"
+        " категории."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что карточка публикации обновляется после её изменения."
+    )
+
+
+def test_post_card_shows_stored_excerpt(client, post_with_published_location):
+    post = post_with_published_location
+    post.text = " ".join(f"слово{index}" for index in range(30))
+    post.save()
+    assert post.excerpt == " ".join(
+        f"слово{index}" for index in range(10)) + " …"
+    content = client.get("/").content.decode("utf-8")
+    assert post.excerpt in content
+    assert "слово10" not in content, (
+        "Убедитесь, что карточка показывает анонс, а не полный текст."
+    )
+
+
+def test_render_post_texts_backfills(client, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        text="первая строка\n<b>вторая</b>", excerpt="", text_html="")
+    call_command("render_post_texts", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.excerpt == "первая строка <b>вторая</b>"
+    assert post.text_html == (
+        "первая строка<br>&lt;b&gt;вторая&lt;/b&gt;"), (
+        "Убедитесь, что команда заполняет экранированный HTML текста."
+    )
+    content = client.get(f"/posts/{post.pk}/").content.decode("utf-8")
+    assert post.text_html in content
+
+
+def test_render_post_texts_refreshes_cached_cards(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.excerpt in client.get("/").content.decode("utf-8")
+    Post.objects.filter(pk=post.pk).update(text="Исправленный текст")
+    assert "Исправленный" not in client.get("/").content.decode("utf-8")
+    call_command("render_post_texts", stdout=StringIO())
+    assert "Исправленный текст" in client.get("/").content.decode(
+        "utf-8"), (
+        "Убедитесь, что после пересчёта анонсов кэшированные карточки и"
+        " страницы показывают новый анонс."
+    )
+
+
+def test_fixture_loads_with_updated(settings):
+    call_command("loaddata", settings.BASE_DIR / "db.json", verbosity=0)
+    assert Post.objects.exists()
+    assert not Post.objects.filter(updated__isnull=True).exists(), (
+        "Убедитесь, что при загрузке фикстуры заполняется время изменения"
+        " публикации."
+    )
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog import publishing
+from blog.publishing import post_published, publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(seconds=30)
+    )
+
+
+@pytest.fixture
+def later(monkeypatch):
+    now = timezone.now() + timedelta(minutes=1)
+    monkeypatch.setattr(timezone, "now", lambda: now)
+
+
+def feed_ids(client):
+    response = client.get("/")
+    content = response.content.decode()
+    return [post.id for post in Post.objects.all()
+            if f"/posts/{post.id}/" in content]
+
+
+def test_scheduled_post_appears_on_time(client, scheduled_post, request):
+    assert not scheduled_post.is_visible
+    assert feed_ids(client) == []
+
+    request.getfixturevalue("later")
+    assert feed_ids(client) == [scheduled_post.id], (
+        "Убедитесь, что отложенная публикация появляется в ленте, включая"
+        " закэшированную страницу, как только наступает её дата."
+    )
+    scheduled_post.refresh_from_db()
+    assert scheduled_post.is_visible
+
+
+def test_publish_command_sends_event(scheduled_post, later):
+    received = []
+
+    def receiver(sender, pks, **kwargs):
+        received.extend(pks)
+
+    post_published.connect(receiver)
+    try:
+        call_command("publish_scheduled_posts", stdout=StringIO())
+    finally:
+        post_published.disconnect(receiver)
+    assert received == [scheduled_post.id]
+
+
+def test_already_published_rows_send_no_event(
+        scheduled_post, later, monkeypatch):
+    assert publish_due_posts() == 1
+    # Другой запрос успел прочитать те же строки до их публикации.
+    monkeypatch.setattr(publishing, "pending_posts",
+                        lambda: Post.objects.filter(is_published=True))
+    received = []
+
+    def receiver(sender, pks, **kwargs):
+        received.extend(pks)
+
+    post_published.connect(receiver)
+    try:
+        assert publish_due_posts() == 0
+    finally:
+        post_published.disconnect(receiver)
+    assert received == [], (
+        "Убедитесь, что событие публикации отправляет только тот вызов,"
+        " который действительно опубликовал посты."
+    )
+
+
+def test_category_publication_updates_visibility(
+        post_with_published_location
+):
+    post = post_with_published_location
+    category = post.category
+    assert post.is_visible
+    category.is_published = False
+    category.save()
+    post.refresh_from_db()
+    assert not post.is_visible, (
+        "Убедитесь, что снятие категории с публикации скрывает её посты."
+    )
+    category.is_published = True
+    category.save()
+    post.refresh_from_db()
+    assert post.is_visible
@@ -0,0 +1,102 @@
+import pytest
+
+from blog.lookups import refresh_tables
+from blog.publishing import next_due
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия и пользователь для авторизованного запроса
+AUTH_QUERIES = 2
+
+
+@pytest.fixture(autouse=True)
+def cache_next_due(clear_cache):
+    # Срок ближайшей отложенной публикации кэшируется между запросами.
+    next_due()
+
+
+@pytest.fixture
+def post_with_comments(mixer, post_with_published_location, user):
+    mixer.cycle(3).blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    return post_with_published_location
+
+
+@pytest.mark.parametrize(
+    "client_fixture, queries",
+    [
+        ("unlogged_client", 2),
+        ("user_client", 2 + AUTH_QUERIES),
+        ("another_user_client", 2 + AUTH_QUERIES),
+    ],
+    ids=["anonymous", "author", "another user"],
+)
+def test_post_detail_queries(
+        request, django_assert_num_queries, post_with_comments,
+        client_fixture, queries
+):
+    client = request.getfixturevalue(client_fixture)
+    # Категории и места уже загружены в память процесса.
+    refresh_tables()
+    with django_assert_num_queries(queries):
+        response = client.get(f"/posts/{post_with_comments.id}/")
+    assert response.status_code == 200
+
+
+def test_hidden_post_detail_queries(
+        django_assert_num_queries, another_user_client,
+        unpublished_posts_with_published_locations
+):
+    post = unpublished_posts_with_published_locations[0]
+    # Категории и места уже загружены в память процесса.
+    refresh_tables()
+    with django_assert_num_queries(1 + AUTH_QUERIES):
+        response = another_user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "url, queries",
+    [
+        # COUNT и выборка страницы по таблице лент, публикации страницы
+        ("/", 3),
+        # категория берётся из памяти процесса
+        ("/category/{category}/", 3),
+        # пользователь, COUNT и выборка страницы
+        ("/profile/{author}/", 3),
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_post_list_queries(
+        django_assert_num_queries, user_client,
+        many_posts_with_published_locations, url, queries
+):
+    post = many_posts_with_published_locations[0]
+    url = url.format(
+        category=post.category.slug, author=post.author.username
+    )
+    # Категории и места уже загружены в память процесса.
+    refresh_tables()
+    with django_assert_num_queries(queries + AUTH_QUERIES):
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert len(response.context["page_obj"]) > 0
+
+
+@pytest.mark.parametrize("url", ["/", "/profile/{author}/"])
+def test_feed_selects_card_columns(
+        django_assert_max_num_queries, user_client,
+        many_posts_with_published_locations, url
+):
+    post = many_posts_with_published_locations[0]
+    with django_assert_max_num_queries(10) as context:
+        user_client.get(url.format(author=post.author.username))
+    sql = "\n".join(query["sql"] for query in context.captured_queries
+                    if '"blog_post"' in query["sql"])
+    for column in ('"blog_post"."text"', '"auth_user"."password"',
+                   '"blog_category"."description"'):
+        assert column not in sql, (
+            "Убедитесь, что лента выбирает только поля, нужные карточке:"
+            f" {column} не нужен."
+        )
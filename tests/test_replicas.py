@@ -0,0 +1,81 @@
+import pytest
+from django.core.cache import cache
+from django.contrib.auth.models import AnonymousUser
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from blog.models import Post
+from blog.caching import bump_tags, get_or_compute
+from blog.replicas import PRIMARY_PIN_COOKIE, replica_reads
+
+
+@replica_reads
+def read_view(request):
+    return HttpResponse(router.db_for_read(Post))
+
+
+def read_database(**cookies):
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    request.COOKIES.update(cookies)
+    return read_view(request).content.decode()
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+def test_reads_go_to_replica():
+    assert read_database() == "replica", (
+        "Убедитесь, что представления только для чтения читают с реплики."
+    )
+    assert router.db_for_read(Post) == "default", (
+        "Убедитесь, что вне таких представлений чтение идёт с основной БД."
+    )
+    assert router.db_for_write(Post) == "default"
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+def test_pinned_visitor_reads_primary():
+    assert read_database(**{PRIMARY_PIN_COOKIE: "1"}) == "default", (
+        "Убедитесь, что посетитель, недавно изменявший данные, читает с"
+        " основной БД."
+    )
+
+
+def test_without_replicas_reads_primary():
+    assert read_database() == "default"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("replicas", [["replica"], []])
+def test_comment_pins_primary(user_client, post_with_published_location,
+                              replicas):
+    with override_settings(DATABASE_REPLICAS=replicas):
+        response = user_client.post(
+            f"/posts/{post_with_published_location.id}/comment/",
+            data={"text": "Комментарий"},
+        )
+    assert response.status_code == 302
+    assert (PRIMARY_PIN_COOKIE in response.cookies) == bool(replicas), (
+        "Убедитесь, что после изменения данных посетитель закрепляется за"
+        " основной БД, только если реплики настроены."
+    )
+
+
+@replica_reads
+def caching_view(request):
+    return HttpResponse(get_or_compute("value", lambda: "replica", 60))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+def test_replica_reads_not_cached_after_write():
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    bump_tags(("feed",))
+    caching_view(request)
+    assert cache.get("value") is None, (
+        "Убедитесь, что прочитанное с реплики вскоре после изменения данных"
+        " не попадает в кэш."
+    )
+    cache.clear()
+    caching_view(request)
+    assert cache.get("value") is not None
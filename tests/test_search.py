@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from blog.search import ContainsSearchBackend, get_backend, terms
+
+pytestmark = [pytest.mark.django_db]
+
+
+def search_ids(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_russian_word_forms_share_stem():
+    assert len(set(terms("публикация публикации публикаций"))) == 1
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    def make(title, text="", is_published=True):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title=title, text=text, is_published=is_published,
+            pub_date=timezone.now() - timedelta(days=1))
+    return {
+        "title": make("Прогулки по горам", "Короткая заметка"),
+        "text": make("Заметка", "Вчера гуляли в горах до вечера"),
+        "other": make("Рецепт пирога", "Мука и яблоки"),
+        "hidden": make("Горы зимой", is_published=False),
+    }
+
+
+def test_search_finds_word_forms_ranked(client, posts):
+    ids = search_ids(client, "гора")
+    assert ids == [posts["title"].id, posts["text"].id], (
+        "Убедитесь, что поиск находит формы слова, не показывает снятые с"
+        " публикации посты и ставит совпадения в заголовке выше."
+    )
+
+
+def test_index_follows_post_changes(client, posts):
+    post = posts["other"]
+    post.title = "Пирог после прогулки в горы"
+    post.save()
+    assert post.id in search_ids(client, "горы")
+    post.delete()
+    assert post.id not in search_ids(client, "горы")
+
+
+def test_query_syntax_is_not_passed_to_index(client, posts):
+    assert search_ids(client, '"горы*" ^(') == search_ids(client, "горы")
+    assert search_ids(client, "") == []
+
+
+def test_rebuild_search_index(client, posts):
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_search")
+    assert search_ids(client, "горы") == []
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert len(search_ids(client, "горы")) == 2
+
+
+def test_pagination_keeps_query(client, mixer, user, published_category):
+    mixer.cycle(12).blend(
+        "blog.Post", author=user, category=published_category,
+        title="Горная тропа", is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    response = client.get("/search/", {"q": "горы"})
+    assert 'href="?q=%D0%B3%D0%BE%D1%80%D1%8B&amp;page=2"' in (
+        response.content.decode()
+    )
+    assert len(search_ids(client, "горы", page=2)) == 2
+
+
+@pytest.fixture
+def fresh_backend():
+    get_backend.cache_clear()
+    yield
+    get_backend.cache_clear()
+
+
+def test_backend_follows_database_vendor(fresh_backend, monkeypatch):
+    monkeypatch.setattr(connection, "vendor", "mysql")
+    assert isinstance(get_backend(), ContainsSearchBackend), (
+        "Убедитесь, что для СУБД без полнотекстового индекса выбирается"
+        " поиск подстрок."
+    )
+
+
+def test_contains_backend(client, posts, settings, fresh_backend):
+    settings.SEARCH_BACKEND = "blog.search.ContainsSearchBackend"
+    posts["other"].save()
+    assert search_ids(client, "гора") == [posts["text"].id, posts["title"].id]
@@ -0,0 +1,40 @@
+import threading
+
+from blog.workers import PeriodicTask, PeriodicWorker
+
+
+def test_task_delay_is_capped_by_interval(settings):
+    settings.POST_IMAGE_INTERVAL = 30
+    task = PeriodicTask("task", lambda: 0, "POST_IMAGE_INTERVAL",
+                        "POST_IMAGE_IN_PROCESS", next_delay=lambda: 5)
+    assert task.delay() == 5
+    assert task.delay(interval=2) == 2
+    task.next_delay = lambda: -1
+    assert task.delay() == 0
+
+
+def test_worker_runs_task_and_wakes_early(settings):
+    settings.POST_IMAGE_INTERVAL = 60
+    runs = []
+    ran = threading.Event()
+
+    def run():
+        runs.append(1)
+        ran.set()
+        return 0
+
+    worker = PeriodicWorker(PeriodicTask(
+        "task", run, "POST_IMAGE_INTERVAL", "POST_IMAGE_IN_PROCESS"))
+    worker.start()
+    try:
+        assert ran.wait(5)
+        ran.clear()
+        worker.wake()
+        assert ran.wait(5), (
+            "Убедитесь, что фоновый обработчик запускает задачу досрочно"
+            " по wake()."
+        )
+    finally:
+        worker.stop()
+        worker.join(5)
+    assert len(runs) >= 2